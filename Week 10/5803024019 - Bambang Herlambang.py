@@ -1,125 +1,229 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from datetime import datetime, timedelta
-import uuid
-
-class Buku:
-    def __init__(self, judul, penulis, isbn, tahun_terbit):
-        self.judul = judul
-        self.penulis = penulis
-        self.isbn = isbn
-        self.tahun_terbit = tahun_terbit
-        self.tersedia = True
-
-    def __str__(self):
-        status = "Tersedia" if self.tersedia else "Dipinjam"
-        return f"{self.judul} oleh {self.penulis} ({self.tahun_terbit}) - {status}"
-
-
-class Pelanggan:
-    def __init__(self, id_pelanggan, nama, alamat, no_telepon):
-        self.id_pelanggan = id_pelanggan
-        self.nama = nama
-        self.alamat = alamat
-        self.no_telepon = no_telepon
-        self.buku_dipinjam = []
-
-    def __str__(self):
-        return f"{self.nama} (ID: {self.id_pelanggan})"
-
-
-class Transaksi:
-    def __init__(self, id_transaksi, pelanggan, buku, tanggal_pinjam):
-        self.id_transaksi = id_transaksi
-        self.pelanggan = pelanggan
-        self.buku = buku
-        self.tanggal_pinjam = tanggal_pinjam
-        self.tanggal_kembali = tanggal_pinjam + timedelta(days=14)  # Asumsi peminjaman 14 hari
-        self.status = "Dipinjam"  # Dipinjam atau Dikembalikan
-
-    def __str__(self):
-        return f"ID: {self.id_transaksi} - {self.pelanggan.nama} meminjam '{self.buku.judul}' pada {self.tanggal_pinjam.strftime('%d/%m/%Y')} - Status: {self.status}"
-
-
-class Perpustakaan:
-    def __init__(self):
-        self.koleksi_buku = []
-        self.daftar_pelanggan = []
-        self.transaksi = []
-
-    def tambah_buku(self, buku):
-        self.koleksi_buku.append(buku)
-        return True
-
-    def cari_buku_berdasarkan_isbn(self, isbn):
-        for buku in self.koleksi_buku:
-            if buku.isbn == isbn:
-                return buku
-        return None
-
-    def daftar_buku_tersedia(self):
-        return [buku for buku in self.koleksi_buku if buku.tersedia]
-
-    def tambah_pelanggan(self, pelanggan):
-        self.daftar_pelanggan.append(pelanggan)
-        return True
-
-    def cari_pelanggan(self, id_pelanggan):
-        for pelanggan in self.daftar_pelanggan:
-            if pelanggan.id_pelanggan == id_pelanggan:
-                return pelanggan
-        return None
-
-    def pinjam_buku(self, id_pelanggan, isbn):
-        pelanggan = self.cari_pelanggan(id_pelanggan)
-        buku = self.cari_buku_berdasarkan_isbn(isbn)
-        
-        if not pelanggan:
-            return False, "Pelanggan tidak ditemukan"
-        
-        if not buku:
-            return False, "Buku tidak ditemukan"
-        
-        if not buku.tersedia:
-            return False, "Buku tidak tersedia"
-        
-        # Proses peminjaman
-        id_transaksi = str(uuid.uuid4())[:8]  # Buat ID transaksi sederhana
-        transaksi_baru = Transaksi(id_transaksi, pelanggan, buku, datetime.now())
-        self.transaksi.append(transaksi_baru)
-        
-        buku.tersedia = False
-        pelanggan.buku_dipinjam.append(buku)
-        
-        return True, id_transaksi
-
-    def kembalikan_buku(self, id_transaksi):
-        for transaksi in self.transaksi:
-            if transaksi.id_transaksi == id_transaksi and transaksi.status == "Dipinjam":
-                transaksi.status = "Dikembalikan"
-                transaksi.buku.tersedia = True
-                
-                # Hapus buku dari daftar buku yang dipinjam oleh pelanggan
-                if transaksi.buku in transaksi.pelanggan.buku_dipinjam:
-                    transaksi.pelanggan.buku_dipinjam.remove(transaksi.buku)
-                
-                return True
-        
-        return False
+from tkinter import ttk, messagebox, filedialog
+from datetime import datetime
+import os
+import queue
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from penyimpanan import PenyimpananSQLite
+from jurnal import JurnalPerpustakaan
+from perpustakaan import Buku, Pelanggan, Perpustakaan
+
+
+class TreeviewVirtual(ttk.Treeview):
+    """Treeview yang hanya membuat baris untuk jendela yang sedang terlihat.
+
+    Data diambil dari model lewat fungsi jumlah_data/ambil_data, sehingga jumlah item
+    di widget tetap sebanyak baris yang terlihat berapapun ukuran koleksinya.
+    """
+
+    def __init__(self, parent, jumlah_data, ambil_data, kunci_data, format_data, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.jumlah_data = jumlah_data
+        self.ambil_data = ambil_data
+        self.kunci_data = kunci_data
+        self.format_data = format_data
+
+        self.awal = 0
+        self.jumlah_terlihat = int(kwargs.get("height", 10))
+        self.item_per_kunci = {}
+        self.scrollbar = None
+
+        style = ttk.Style(self)
+        self.tinggi_baris = int(style.lookup("Treeview", "rowheight") or 20)
+
+        self.bind("<Configure>", self._saat_ukuran_berubah)
+        self.bind("<MouseWheel>", lambda e: self.yview("scroll", -3 if e.delta > 0 else 3, "units"))
+        self.bind("<Button-4>", lambda e: self.yview("scroll", -3, "units"))
+        self.bind("<Button-5>", lambda e: self.yview("scroll", 3, "units"))
+
+    def atur_scrollbar(self, scrollbar):
+        self.scrollbar = scrollbar
+        scrollbar.configure(command=self.yview)
+
+    def yview(self, *args):
+        total = self.jumlah_data()
+        if not args:
+            if total == 0:
+                return 0.0, 1.0
+            return self.awal / total, min(1.0, (self.awal + self.jumlah_terlihat) / total)
+
+        if args[0] == "moveto":
+            self.awal = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            langkah = int(args[1])
+            if args[2] == "pages":
+                langkah *= self.jumlah_terlihat
+            self.awal += langkah
+        self.refresh()
+
+    def _saat_ukuran_berubah(self, event):
+        # Kurangi tinggi header, lalu hitung berapa baris yang muat
+        jumlah = max(1, (event.height - self.tinggi_baris) // self.tinggi_baris)
+        if jumlah != self.jumlah_terlihat:
+            self.jumlah_terlihat = jumlah
+            self.refresh()
+
+    def refresh(self):
+        total = self.jumlah_data()
+        self.awal = max(0, min(self.awal, total - self.jumlah_terlihat))
+        akhir = min(total, self.awal + self.jumlah_terlihat)
+
+        # Item yang sudah ada dipakai ulang, hanya isinya yang diganti
+        items = self.get_children()
+        self.item_per_kunci = {}
+        for posisi, indeks in enumerate(range(self.awal, akhir)):
+            data = self.ambil_data(indeks)
+            nilai = self.format_data(data)
+            if posisi < len(items):
+                item = items[posisi]
+                self.item(item, values=nilai)
+            else:
+                item = self.insert("", "end", values=nilai)
+            self.item_per_kunci[self.kunci_data(data)] = item
+
+        if len(items) > akhir - self.awal:
+            self.delete(*items[akhir - self.awal:])
+
+        if self.scrollbar:
+            self.scrollbar.set(*self.yview())
+
+    def perbarui(self, data):
+        """Memperbarui satu baris di tempat jika baris tersebut sedang terlihat"""
+        item = self.item_per_kunci.get(self.kunci_data(data))
+        if item:
+            self.item(item, values=self.format_data(data))
+
+
+class TugasDibatalkan(Exception):
+    pass
+
+
+class Tugas:
+    """Satu operasi yang berjalan di worker; bisa dibatalkan dan melaporkan progres"""
+
+    def __init__(self, antrian, selesai=None, gagal=None, progres=None):
+        self.antrian = antrian
+        self.selesai = selesai
+        self.gagal = gagal
+        self.progres = progres
+        self._batal = threading.Event()
+
+    def batalkan(self):
+        self._batal.set()
+
+    @property
+    def dibatalkan(self):
+        return self._batal.is_set()
+
+    def periksa_batal(self):
+        if self.dibatalkan:
+            raise TugasDibatalkan()
+
+    def laporkan_progres(self, *args):
+        # Dipanggil dari worker; juga menjadi titik pembatalan operasi yang panjang
+        self.periksa_batal()
+        if self.progres:
+            self.antrian.put((self._teruskan_progres, args))
+
+    def _teruskan_progres(self, *args):
+        # Progres yang tiba setelah tugas dibatalkan tidak diteruskan ke UI
+        if not self.dibatalkan:
+            self.progres(*args)
+
+
+class PelaksanaTugas:
+    """Menjalankan operasi model di thread pool dan mengirim hasilnya kembali
+    ke thread Tk lewat after(), sehingga jendela tidak pernah membeku"""
+
+    def __init__(self, root, jumlah_worker=2, interval=50):
+        self.root = root
+        self.interval = interval
+        self.executor = ThreadPoolExecutor(max_workers=jumlah_worker)
+        self.antrian = queue.Queue()
+        self.tugas_aktif = set()
+        self._id_after = self.root.after(self.interval, self._proses_antrian)
+
+    def jalankan(self, fungsi, selesai=None, gagal=None, progres=None):
+        """Menjalankan fungsi(tugas) di worker. Callback selesai/gagal/progres dipanggil di thread Tk."""
+        tugas = Tugas(self.antrian, selesai, gagal, progres)
+        self.tugas_aktif.add(tugas)
+        self.executor.submit(self._kerjakan, fungsi, tugas)
+        return tugas
+
+    def _kerjakan(self, fungsi, tugas):
+        try:
+            tugas.periksa_batal()
+            hasil = fungsi(tugas)
+        except TugasDibatalkan:
+            self.antrian.put((self.tugas_aktif.discard, (tugas,)))
+        except Exception as e:
+            self.antrian.put((self._akhiri, (tugas, tugas.gagal, e)))
+        else:
+            self.antrian.put((self._akhiri, (tugas, tugas.selesai, hasil)))
+
+    def _akhiri(self, tugas, callback, nilai):
+        self.tugas_aktif.discard(tugas)
+        if callback and not tugas.dibatalkan:
+            callback(nilai)
+
+    def _proses_antrian(self):
+        try:
+            while True:
+                try:
+                    callback, args = self.antrian.get_nowait()
+                except queue.Empty:
+                    break
+                # Kesalahan satu callback dilaporkan seperti kesalahan callback Tk lainnya,
+                # tanpa menghentikan callback berikutnya
+                try:
+                    callback(*args)
+                except Exception:
+                    self.root.report_callback_exception(*sys.exc_info())
+        finally:
+            # Selalu dijadwalkan ulang, agar hasil tugas berikutnya tetap sampai ke UI
+            self._id_after = self.root.after(self.interval, self._proses_antrian)
+
+    def tutup(self):
+        for tugas in list(self.tugas_aktif):
+            tugas.batalkan()
+        self.root.after_cancel(self._id_after)
+        self.executor.shutdown(wait=True, cancel_futures=True)
 
 
 class AppPerpustakaan(tk.Tk):
-    def __init__(self):
+    UKURAN_HALAMAN_TRANSAKSI = 100
+
+    def __init__(self, penyimpanan=None):
         super().__init__()
         self.title("Sistem Manajemen Perpustakaan")
         self.geometry("800x600")
-        self.perpustakaan = Perpustakaan()
+        if penyimpanan is None:
+            penyimpanan = PenyimpananSQLite("perpustakaan.db")
+        self.perpustakaan = Perpustakaan(penyimpanan)
         
-        # Inisialisasi data dummy
-        self.inisialisasi_data_dummy()
+        # Operasi berat (impor, pencarian, laporan) dijalankan di worker thread
+        self.pelaksana = PelaksanaTugas(self)
+        self.tugas_cari_buku = None
+        
+        # Inisialisasi data dummy hanya jika database masih kosong
+        if not self.perpustakaan.koleksi_buku:
+            self.inisialisasi_data_dummy()
+            self.perpustakaan.simpan()
         
         # Setup UI
         self.setup_ui()
+        
+        # Simpan data yang belum di-commit saat jendela ditutup
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+    def on_closing(self):
+        # Tunggu worker berhenti sebelum penyimpanan ditutup
+        self.pelaksana.tutup()
+        self.perpustakaan.tutup()
+        self.destroy()
 
     def inisialisasi_data_dummy(self):
         # Tambah beberapa buku
@@ -185,17 +289,42 @@ class AppPerpustakaan(tk.Tk):
         self.entry_tahun = ttk.Entry(frame_form, width=40)
         self.entry_tahun.grid(row=3, column=1, padx=5, pady=5)
         
+        ttk.Label(frame_form, text="Jumlah Eksemplar:").grid(row=4, column=0, sticky="w", padx=5, pady=5)
+        self.entry_eksemplar = ttk.Entry(frame_form, width=40)
+        self.entry_eksemplar.insert(0, "1")
+        self.entry_eksemplar.grid(row=4, column=1, padx=5, pady=5)
+        
         # Tombol Tambah
         btn_tambah = ttk.Button(frame_form, text="Tambah Buku", command=self.tambah_buku)
-        btn_tambah.grid(row=4, column=0, columnspan=2, pady=10)
+        btn_tambah.grid(row=5, column=0, pady=10)
+        
+        # Tombol Impor dari berkas
+        btn_impor = ttk.Button(frame_form, text="Impor Buku (CSV/JSONL)", command=self.impor_buku)
+        btn_impor.grid(row=5, column=1, pady=10)
         
         # Frame untuk daftar buku
         frame_daftar = ttk.LabelFrame(parent, text="Daftar Buku")
         frame_daftar.pack(fill="both", expand=True, padx=10, pady=10)
         
+        # Kotak pencarian judul/penulis (hasil diperbarui saat mengetik)
+        frame_cari = ttk.Frame(frame_daftar)
+        frame_cari.pack(side="top", fill="x", padx=5, pady=5)
+        ttk.Label(frame_cari, text="Cari Judul/Penulis:").pack(side="left")
+        self.entry_cari_buku = ttk.Entry(frame_cari, width=40)
+        self.entry_cari_buku.pack(side="left", padx=5)
+        self.entry_cari_buku.bind("<KeyRelease>", lambda e: self.cari_buku())
+        ttk.Button(frame_cari, text="Reset", command=self.reset_cari_buku).pack(side="left")
+        self.hasil_cari_buku = None
+        
         # Treeview untuk menampilkan buku
         columns = ("judul", "penulis", "isbn", "tahun", "status")
-        self.tree_buku = ttk.Treeview(frame_daftar, columns=columns, show="headings")
+        self.tree_buku = TreeviewVirtual(
+            frame_daftar,
+            jumlah_data=lambda: len(self.daftar_buku_tampil()),
+            ambil_data=lambda i: self.daftar_buku_tampil()[i],
+            kunci_data=lambda buku: buku.isbn,
+            format_data=self.format_buku,
+            columns=columns, show="headings")
         
         # Definisikan header untuk setiap kolom
         self.tree_buku.heading("judul", text="Judul")
@@ -212,8 +341,8 @@ class AppPerpustakaan(tk.Tk):
         self.tree_buku.column("status", width=100)
         
         # Tambahkan scrollbar
-        scrollbar = ttk.Scrollbar(frame_daftar, orient="vertical", command=self.tree_buku.yview)
-        self.tree_buku.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(frame_daftar, orient="vertical")
+        self.tree_buku.atur_scrollbar(scrollbar)
         
         # Pack komponen
         self.tree_buku.pack(side="left", fill="both", expand=True)
@@ -250,7 +379,11 @@ class AppPerpustakaan(tk.Tk):
         
         # Tombol Tambah
         btn_tambah = ttk.Button(frame_form, text="Tambah Pelanggan", command=self.tambah_pelanggan)
-        btn_tambah.grid(row=4, column=0, columnspan=2, pady=10)
+        btn_tambah.grid(row=4, column=0, pady=10)
+        
+        # Tombol Impor dari berkas
+        btn_impor = ttk.Button(frame_form, text="Impor Pelanggan (CSV/JSONL)", command=self.impor_pelanggan)
+        btn_impor.grid(row=4, column=1, pady=10)
         
         # Frame untuk daftar pelanggan
         frame_daftar = ttk.LabelFrame(parent, text="Daftar Pelanggan")
@@ -258,7 +391,13 @@ class AppPerpustakaan(tk.Tk):
         
         # Treeview untuk menampilkan pelanggan
         columns = ("id", "nama", "alamat", "telepon", "buku_dipinjam")
-        self.tree_pelanggan = ttk.Treeview(frame_daftar, columns=columns, show="headings")
+        self.tree_pelanggan = TreeviewVirtual(
+            frame_daftar,
+            jumlah_data=lambda: len(self.perpustakaan.daftar_pelanggan),
+            ambil_data=lambda i: self.perpustakaan.daftar_pelanggan[i],
+            kunci_data=lambda pelanggan: pelanggan.id_pelanggan,
+            format_data=self.format_pelanggan,
+            columns=columns, show="headings")
         
         # Definisikan header untuk setiap kolom
         self.tree_pelanggan.heading("id", text="ID")
@@ -275,8 +414,8 @@ class AppPerpustakaan(tk.Tk):
         self.tree_pelanggan.column("buku_dipinjam", width=150)
         
         # Tambahkan scrollbar
-        scrollbar = ttk.Scrollbar(frame_daftar, orient="vertical", command=self.tree_pelanggan.yview)
-        self.tree_pelanggan.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(frame_daftar, orient="vertical")
+        self.tree_pelanggan.atur_scrollbar(scrollbar)
         
         # Pack komponen
         self.tree_pelanggan.pack(side="left", fill="both", expand=True)
@@ -321,13 +460,89 @@ class AppPerpustakaan(tk.Tk):
         btn_kembali.grid(row=1, column=0, columnspan=2, pady=10)
 
     def setup_tab_laporan(self, parent):
+        # Frame untuk ringkasan laporan
+        frame_ringkasan = ttk.LabelFrame(parent, text="Ringkasan")
+        frame_ringkasan.pack(fill="x", padx=10, pady=10)
+        
+        self.label_ringkasan = ttk.Label(frame_ringkasan, text="")
+        self.label_ringkasan.grid(row=0, column=0, columnspan=3, sticky="w", padx=5, pady=5)
+        
+        # Tabel kecil untuk buku terpopuler, peminjam teratas dan peminjaman per bulan
+        self.tree_buku_teratas = ttk.Treeview(frame_ringkasan, columns=("judul", "jumlah"), show="headings", height=5)
+        self.tree_buku_teratas.heading("judul", text="Buku Terpopuler")
+        self.tree_buku_teratas.heading("jumlah", text="Dipinjam")
+        self.tree_buku_teratas.column("judul", width=200)
+        self.tree_buku_teratas.column("jumlah", width=70)
+        self.tree_buku_teratas.grid(row=1, column=0, padx=5, pady=5)
+        
+        self.tree_peminjam_teratas = ttk.Treeview(frame_ringkasan, columns=("nama", "jumlah"), show="headings", height=5)
+        self.tree_peminjam_teratas.heading("nama", text="Peminjam Teratas")
+        self.tree_peminjam_teratas.heading("jumlah", text="Pinjaman")
+        self.tree_peminjam_teratas.column("nama", width=150)
+        self.tree_peminjam_teratas.column("jumlah", width=70)
+        self.tree_peminjam_teratas.grid(row=1, column=1, padx=5, pady=5)
+        
+        self.tree_pinjam_bulanan = ttk.Treeview(frame_ringkasan, columns=("bulan", "jumlah"), show="headings", height=5)
+        self.tree_pinjam_bulanan.heading("bulan", text="Bulan")
+        self.tree_pinjam_bulanan.heading("jumlah", text="Peminjaman")
+        self.tree_pinjam_bulanan.column("bulan", width=80)
+        self.tree_pinjam_bulanan.column("jumlah", width=80)
+        self.tree_pinjam_bulanan.grid(row=1, column=2, padx=5, pady=5)
+        
+        btn_ringkasan = ttk.Button(frame_ringkasan, text="Perbarui Ringkasan", command=self.refresh_ringkasan)
+        btn_ringkasan.grid(row=2, column=0, columnspan=3, pady=5)
+        
+        self.refresh_ringkasan()
+        
         # Frame untuk laporan transaksi
         frame_laporan = ttk.LabelFrame(parent, text="Daftar Transaksi")
         frame_laporan.pack(fill="both", expand=True, padx=10, pady=10)
         
+        # Filter dan navigasi halaman
+        frame_filter = ttk.Frame(frame_laporan)
+        frame_filter.pack(side="top", fill="x", padx=5, pady=5)
+        
+        ttk.Label(frame_filter, text="Status:").pack(side="left")
+        self.combo_filter_status = ttk.Combobox(
+            frame_filter, values=("Semua", "Dipinjam", "Dikembalikan"), state="readonly", width=12)
+        self.combo_filter_status.current(0)
+        self.combo_filter_status.pack(side="left", padx=5)
+        
+        ttk.Label(frame_filter, text="ID Pelanggan:").pack(side="left")
+        self.entry_filter_pelanggan = ttk.Entry(frame_filter, width=10)
+        self.entry_filter_pelanggan.pack(side="left", padx=5)
+        
+        ttk.Label(frame_filter, text="Dari (dd/mm/yyyy):").pack(side="left")
+        self.entry_filter_dari = ttk.Entry(frame_filter, width=11)
+        self.entry_filter_dari.pack(side="left", padx=5)
+        
+        ttk.Label(frame_filter, text="Sampai:").pack(side="left")
+        self.entry_filter_sampai = ttk.Entry(frame_filter, width=11)
+        self.entry_filter_sampai.pack(side="left", padx=5)
+        
+        ttk.Button(frame_filter, text="Terapkan", command=self.terapkan_filter_transaksi).pack(side="left", padx=5)
+        
+        frame_halaman = ttk.Frame(frame_laporan)
+        frame_halaman.pack(side="bottom", fill="x", padx=5, pady=5)
+        ttk.Button(frame_halaman, text="< Sebelumnya", command=lambda: self.pindah_halaman_transaksi(-1)).pack(side="left")
+        self.label_halaman = ttk.Label(frame_halaman, text="")
+        self.label_halaman.pack(side="left", padx=10)
+        ttk.Button(frame_halaman, text="Berikutnya >", command=lambda: self.pindah_halaman_transaksi(1)).pack(side="left")
+        
+        self.filter_transaksi = {}
+        self.nomor_halaman = 0
+        self.isi_halaman_transaksi = []
+        self.ada_halaman_berikutnya = False
+        
         # Treeview untuk menampilkan transaksi
         columns = ("id", "pelanggan", "buku", "tanggal_pinjam", "tanggal_kembali", "status")
-        self.tree_transaksi = ttk.Treeview(frame_laporan, columns=columns, show="headings")
+        self.tree_transaksi = TreeviewVirtual(
+            frame_laporan,
+            jumlah_data=lambda: len(self.isi_halaman_transaksi),
+            ambil_data=lambda i: self.isi_halaman_transaksi[i],
+            kunci_data=lambda transaksi: transaksi.id_transaksi,
+            format_data=self.format_transaksi,
+            columns=columns, show="headings")
         
         # Definisikan header untuk setiap kolom
         self.tree_transaksi.heading("id", text="ID Transaksi")
@@ -346,8 +561,8 @@ class AppPerpustakaan(tk.Tk):
         self.tree_transaksi.column("status", width=100)
         
         # Tambahkan scrollbar
-        scrollbar = ttk.Scrollbar(frame_laporan, orient="vertical", command=self.tree_transaksi.yview)
-        self.tree_transaksi.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(frame_laporan, orient="vertical")
+        self.tree_transaksi.atur_scrollbar(scrollbar)
         
         # Pack komponen
         self.tree_transaksi.pack(side="left", fill="both", expand=True)
@@ -366,18 +581,27 @@ class AppPerpustakaan(tk.Tk):
             penulis = self.entry_penulis.get()
             isbn = self.entry_isbn.get()
             tahun = int(self.entry_tahun.get())
+            jumlah_eksemplar = int(self.entry_eksemplar.get() or 1)
             
-            if not (judul and penulis and isbn and tahun):
+            if not (judul and penulis and isbn and tahun) or jumlah_eksemplar < 1:
                 messagebox.showerror("Error", "Semua field harus diisi!")
                 return
             
-            # Cek apakah ISBN sudah ada
-            if self.perpustakaan.cari_buku_berdasarkan_isbn(isbn):
-                messagebox.showerror("Error", f"Buku dengan ISBN {isbn} sudah ada dalam sistem!")
+            # Jika ISBN sudah ada, tawarkan untuk menambah eksemplar judul tersebut
+            buku_lama = self.perpustakaan.cari_buku_berdasarkan_isbn(isbn)
+            if buku_lama:
+                if messagebox.askyesno(
+                        "Konfirmasi",
+                        f"Buku dengan ISBN {isbn} sudah ada dalam sistem. "
+                        f"Tambahkan {jumlah_eksemplar} eksemplar ke '{buku_lama.judul}'?"):
+                    self.perpustakaan.tambah_eksemplar(isbn, jumlah_eksemplar)
+                    self.perpustakaan.simpan()
+                    self.tree_buku.perbarui(buku_lama)
                 return
             
-            buku_baru = Buku(judul, penulis, isbn, tahun)
+            buku_baru = Buku(judul, penulis, isbn, tahun, jumlah_eksemplar)
             if self.perpustakaan.tambah_buku(buku_baru):
+                self.perpustakaan.simpan()
                 messagebox.showinfo("Sukses", f"Buku '{judul}' berhasil ditambahkan!")
                 
                 # Clear form
@@ -385,23 +609,103 @@ class AppPerpustakaan(tk.Tk):
                 self.entry_penulis.delete(0, tk.END)
                 self.entry_isbn.delete(0, tk.END)
                 self.entry_tahun.delete(0, tk.END)
+                self.entry_eksemplar.delete(0, tk.END)
+                self.entry_eksemplar.insert(0, "1")
                 
                 # Refresh daftar buku
                 self.refresh_daftar_buku()
             else:
                 messagebox.showerror("Error", "Gagal menambahkan buku!")
         except ValueError:
-            messagebox.showerror("Error", "Tahun terbit harus berupa angka!")
+            messagebox.showerror("Error", "Tahun terbit dan jumlah eksemplar harus berupa angka!")
 
-    def refresh_daftar_buku(self):
-        # Clear daftar buku
-        for item in self.tree_buku.get_children():
-            self.tree_buku.delete(item)
+    def jalankan_impor(self, judul, fungsi_impor, refresh):
+        path = filedialog.askopenfilename(
+            title=judul,
+            filetypes=[("CSV / JSON", "*.csv *.jsonl *.ndjson *.json"), ("Semua berkas", "*.*")])
+        if not path:
+            return
         
-        # Isi ulang daftar buku
-        for buku in self.perpustakaan.koleksi_buku:
-            status = "Tersedia" if buku.tersedia else "Dipinjam"
-            self.tree_buku.insert("", "end", values=(buku.judul, buku.penulis, buku.isbn, buku.tahun_terbit, status))
+        # Jendela progres
+        jendela = tk.Toplevel(self)
+        jendela.title(judul)
+        jendela.transient(self)
+        ttk.Label(jendela, text=os.path.basename(path)).pack(padx=10, pady=5)
+        progressbar = ttk.Progressbar(jendela, length=300, mode="determinate", maximum=100)
+        progressbar.pack(padx=10, pady=10)
+        
+        def progres(byte_dibaca, ukuran_berkas):
+            progressbar["value"] = 100 * byte_dibaca / max(1, ukuran_berkas)
+        
+        def selesai(hasil):
+            berhasil, ditolak = hasil
+            jendela.destroy()
+            # UI cukup di-refresh sekali setelah seluruh berkas selesai
+            refresh()
+            messagebox.showinfo("Sukses", f"{berhasil} data berhasil diimpor, {ditolak} data ditolak.")
+        
+        def gagal(e):
+            jendela.destroy()
+            refresh()
+            messagebox.showerror("Error", f"Gagal mengimpor berkas: {e}")
+        
+        def batal():
+            # Batch yang sudah tersimpan tetap ada, sisa berkas tidak diimpor
+            tugas.batalkan()
+            jendela.destroy()
+            refresh()
+        
+        tugas = self.pelaksana.jalankan(
+            lambda t: fungsi_impor(path, progres=t.laporkan_progres),
+            selesai=selesai, gagal=gagal, progres=progres)
+        ttk.Button(jendela, text="Batal", command=batal).pack(pady=5)
+        jendela.protocol("WM_DELETE_WINDOW", batal)
+
+    def impor_buku(self):
+        self.jalankan_impor("Impor Buku", self.perpustakaan.impor_buku, self.refresh_daftar_buku)
+
+    def impor_pelanggan(self):
+        self.jalankan_impor("Impor Pelanggan", self.perpustakaan.impor_pelanggan, self.refresh_daftar_pelanggan)
+
+    def daftar_buku_tampil(self):
+        # Hasil pencarian jika ada, selain itu seluruh koleksi
+        if self.hasil_cari_buku is None:
+            return self.perpustakaan.koleksi_buku
+        return self.hasil_cari_buku
+
+    def cari_buku(self):
+        kueri = self.entry_cari_buku.get().strip()
+        # Pencarian sebelumnya yang belum selesai tidak relevan lagi
+        if self.tugas_cari_buku:
+            self.tugas_cari_buku.batalkan()
+            self.tugas_cari_buku = None
+        if not kueri:
+            self.tampilkan_hasil_cari_buku(None)
+            return
+        self.tugas_cari_buku = self.pelaksana.jalankan(
+            lambda t: self.perpustakaan.cari_buku(kueri),
+            selesai=self.tampilkan_hasil_cari_buku)
+
+    def tampilkan_hasil_cari_buku(self, hasil):
+        self.tugas_cari_buku = None
+        self.hasil_cari_buku = hasil
+        self.tree_buku.awal = 0
+        self.refresh_daftar_buku()
+
+    def reset_cari_buku(self):
+        self.entry_cari_buku.delete(0, tk.END)
+        self.cari_buku()
+
+    def format_buku(self, buku):
+        if buku.tersedia:
+            status = f"Tersedia {buku.jumlah_tersedia}/{buku.jumlah_eksemplar}"
+        else:
+            status = "Dipinjam"
+        return (buku.judul, buku.penulis, buku.isbn, buku.tahun_terbit, status)
+
+    def refresh_daftar_buku(self):
+        # Hanya baris yang terlihat yang diambil ulang dari model
+        self.tree_buku.refresh()
 
     def tambah_pelanggan(self):
         id_pelanggan = self.entry_id_pelanggan.get()
@@ -420,6 +724,7 @@ class AppPerpustakaan(tk.Tk):
         
         pelanggan_baru = Pelanggan(id_pelanggan, nama, alamat, telepon)
         if self.perpustakaan.tambah_pelanggan(pelanggan_baru):
+            self.perpustakaan.simpan()
             messagebox.showinfo("Sukses", f"Pelanggan '{nama}' berhasil ditambahkan!")
             
             # Clear form
@@ -433,75 +738,165 @@ class AppPerpustakaan(tk.Tk):
         else:
             messagebox.showerror("Error", "Gagal menambahkan pelanggan!")
 
+    def format_pelanggan(self, pelanggan):
+        jumlah_buku = len(pelanggan.buku_dipinjam)
+        return (pelanggan.id_pelanggan, pelanggan.nama, pelanggan.alamat, pelanggan.no_telepon, jumlah_buku)
+
     def refresh_daftar_pelanggan(self):
-        # Clear daftar pelanggan
-        for item in self.tree_pelanggan.get_children():
-            self.tree_pelanggan.delete(item)
-        
-        # Isi ulang daftar pelanggan
-        for pelanggan in self.perpustakaan.daftar_pelanggan:
-            jumlah_buku = len(pelanggan.buku_dipinjam)
-            self.tree_pelanggan.insert("", "end", values=(pelanggan.id_pelanggan, pelanggan.nama, pelanggan.alamat, pelanggan.no_telepon, jumlah_buku))
+        # Hanya baris yang terlihat yang diambil ulang dari model
+        self.tree_pelanggan.refresh()
 
     def pinjam_buku(self):
         id_pelanggan = self.entry_pinjam_id_pelanggan.get()
-        isbn = self.entry_pinjam_isbn.get()
+        # Beberapa ISBN boleh dipisah koma/spasi untuk dipinjam sekaligus
+        daftar_isbn = self.pisah_daftar(self.entry_pinjam_isbn.get())
         
-        if not (id_pelanggan and isbn):
+        if not (id_pelanggan and daftar_isbn):
             messagebox.showerror("Error", "ID Pelanggan dan ISBN Buku harus diisi!")
             return
         
-        sukses, pesan = self.perpustakaan.pinjam_buku(id_pelanggan, isbn)
+        if len(daftar_isbn) > 1:
+            sukses, pesan = self.perpustakaan.pinjam_buku_batch(id_pelanggan, daftar_isbn)
+            if sukses:
+                messagebox.showinfo("Sukses", f"{len(pesan)} buku berhasil dipinjam! ID Transaksi: {', '.join(pesan)}")
+                self.entry_pinjam_id_pelanggan.delete(0, tk.END)
+                self.entry_pinjam_isbn.delete(0, tk.END)
+                self.refresh_setelah_batch()
+            else:
+                messagebox.showerror("Error", pesan)
+            return
+        
+        sukses, pesan = self.perpustakaan.pinjam_buku(id_pelanggan, daftar_isbn[0])
         
         if sukses:
             messagebox.showinfo("Sukses", f"Buku berhasil dipinjam! ID Transaksi: {pesan}")
             # Clear form
             self.entry_pinjam_id_pelanggan.delete(0, tk.END)
             self.entry_pinjam_isbn.delete(0, tk.END)
-            # Refresh daftar buku dan transaksi
-            self.refresh_daftar_buku()
+            # Perbarui baris buku dan pelanggan di tempat, transaksi baru ditambahkan di akhir
+            transaksi = self.perpustakaan.indeks_transaksi[pesan]
+            self.tree_buku.perbarui(transaksi.buku)
+            self.tree_pelanggan.perbarui(transaksi.pelanggan)
             self.refresh_daftar_transaksi()
-            self.refresh_daftar_pelanggan()
+            self.refresh_ringkasan()
         else:
             messagebox.showerror("Error", pesan)
 
     def kembalikan_buku(self):
-        id_transaksi = self.entry_kembali_id_transaksi.get()
+        daftar_id = self.pisah_daftar(self.entry_kembali_id_transaksi.get())
         
-        if not id_transaksi:
+        if not daftar_id:
             messagebox.showerror("Error", "ID Transaksi harus diisi!")
             return
         
+        if len(daftar_id) > 1:
+            sukses, pesan = self.perpustakaan.kembalikan_buku_batch(daftar_id)
+            if sukses:
+                messagebox.showinfo("Sukses", f"{pesan} buku berhasil dikembalikan!")
+                self.entry_kembali_id_transaksi.delete(0, tk.END)
+                self.refresh_setelah_batch()
+            else:
+                messagebox.showerror("Error", pesan)
+            return
+        
+        id_transaksi = daftar_id[0]
         if self.perpustakaan.kembalikan_buku(id_transaksi):
             messagebox.showinfo("Sukses", "Buku berhasil dikembalikan!")
             # Clear form
             self.entry_kembali_id_transaksi.delete(0, tk.END)
-            # Refresh daftar buku dan transaksi
-            self.refresh_daftar_buku()
-            self.refresh_daftar_transaksi()
-            self.refresh_daftar_pelanggan()
+            # Perbarui hanya baris yang berubah
+            transaksi = self.perpustakaan.indeks_transaksi[id_transaksi]
+            self.tree_buku.perbarui(transaksi.buku)
+            self.tree_pelanggan.perbarui(transaksi.pelanggan)
+            self.tree_transaksi.perbarui(transaksi)
+            self.refresh_ringkasan()
         else:
             messagebox.showerror("Error", "Gagal mengembalikan buku! Periksa ID Transaksi.")
 
+    @staticmethod
+    def pisah_daftar(teks):
+        return [bagian for bagian in re.split(r"[,\s]+", teks) if bagian]
+
+    def refresh_setelah_batch(self):
+        # Satu kali refresh tampilan untuk seluruh batch, bukan per buku
+        self.tree_buku.refresh()
+        self.tree_pelanggan.refresh()
+        self.refresh_daftar_transaksi()
+        self.refresh_ringkasan()
+
+    def format_transaksi(self, transaksi):
+        return (
+            transaksi.id_transaksi,
+            transaksi.pelanggan.nama,
+            transaksi.buku.judul,
+            transaksi.tanggal_pinjam.strftime("%d/%m/%Y"),
+            transaksi.tanggal_kembali.strftime("%d/%m/%Y"),
+            transaksi.status
+        )
+
     def refresh_daftar_transaksi(self):
-        # Clear daftar transaksi
-        for item in self.tree_transaksi.get_children():
-            self.tree_transaksi.delete(item)
-        
-        # Isi ulang daftar transaksi
-        for transaksi in self.perpustakaan.transaksi:
-            tanggal_pinjam = transaksi.tanggal_pinjam.strftime("%d/%m/%Y")
-            tanggal_kembali = transaksi.tanggal_kembali.strftime("%d/%m/%Y")
-            self.tree_transaksi.insert("", "end", values=(
-                transaksi.id_transaksi,
-                transaksi.pelanggan.nama,
-                transaksi.buku.judul,
-                tanggal_pinjam,
-                tanggal_kembali,
-                transaksi.status
-            ))
+        # Ambil ulang halaman aktif dari indeks; tanggal diformat hanya untuk baris yang terlihat
+        self.isi_halaman_transaksi, self.ada_halaman_berikutnya = self.perpustakaan.halaman_transaksi(
+            offset=self.nomor_halaman * self.UKURAN_HALAMAN_TRANSAKSI,
+            batas=self.UKURAN_HALAMAN_TRANSAKSI,
+            **self.filter_transaksi)
+        self.label_halaman.config(text=f"Halaman {self.nomor_halaman + 1}")
+        self.tree_transaksi.refresh()
+
+    def terapkan_filter_transaksi(self):
+        try:
+            dari = self.entry_filter_dari.get().strip()
+            sampai = self.entry_filter_sampai.get().strip()
+            status = self.combo_filter_status.get()
+            id_pelanggan = self.entry_filter_pelanggan.get().strip()
+            self.filter_transaksi = {
+                "status": None if status == "Semua" else status,
+                "id_pelanggan": id_pelanggan or None,
+                "dari": datetime.strptime(dari, "%d/%m/%Y").date() if dari else None,
+                "sampai": datetime.strptime(sampai, "%d/%m/%Y").date() if sampai else None,
+            }
+        except ValueError:
+            messagebox.showerror("Error", "Format tanggal harus dd/mm/yyyy!")
+            return
+        self.nomor_halaman = 0
+        self.tree_transaksi.awal = 0
+        self.refresh_daftar_transaksi()
+
+    def pindah_halaman_transaksi(self, arah):
+        if arah > 0 and not self.ada_halaman_berikutnya:
+            return
+        if arah < 0 and self.nomor_halaman == 0:
+            return
+        self.nomor_halaman += arah
+        self.tree_transaksi.awal = 0
+        self.refresh_daftar_transaksi()
+
+    def refresh_ringkasan(self):
+        self.pelaksana.jalankan(lambda t: self.perpustakaan.ringkasan_laporan(), selesai=self.tampilkan_ringkasan)
+
+    def tampilkan_ringkasan(self, ringkasan):
+        hari_ini = ringkasan["pinjam_harian"][-1][1]
+        self.label_ringkasan.config(text=(
+            f"Pinjaman aktif: {ringkasan['pinjaman_aktif']}   |   "
+            f"Terlambat: {ringkasan['terlambat']}   |   "
+            f"Peminjaman hari ini: {hari_ini}   |   "
+            f"Rata-rata lama pinjam: {ringkasan['rata_rata_lama_pinjam']:.1f} hari"))
+        
+        # Tabel ringkasan hanya berisi beberapa baris, jadi cukup diisi ulang
+        for tree in (self.tree_buku_teratas, self.tree_peminjam_teratas, self.tree_pinjam_bulanan):
+            tree.delete(*tree.get_children())
+        for buku, jumlah in ringkasan["buku_teratas"]:
+            self.tree_buku_teratas.insert("", "end", values=(buku.judul, jumlah))
+        for pelanggan, jumlah in ringkasan["peminjam_teratas"]:
+            self.tree_peminjam_teratas.insert("", "end", values=(pelanggan.nama, jumlah))
+        for (tahun, bulan), jumlah in reversed(ringkasan["pinjam_bulanan"]):
+            self.tree_pinjam_bulanan.insert("", "end", values=(f"{bulan:02d}/{tahun}", jumlah))
 
 
 if __name__ == "__main__":
-    app = AppPerpustakaan()
+    # Gunakan --jurnal untuk penyimpanan jurnal append-only sebagai pengganti SQLite
+    if "--jurnal" in sys.argv:
+        app = AppPerpustakaan(JurnalPerpustakaan("perpustakaan.jurnal"))
+    else:
+        app = AppPerpustakaan()
     app.mainloop()
@@ -0,0 +1,157 @@
+"""Benchmark operasi Perpustakaan tanpa GUI.
+
+Untuk setiap skala (jumlah buku) dibuat katalog dan pelanggan sintetis, lalu diukur
+waktu per operasi tambah_buku, cari_buku_berdasarkan_isbn, pinjam_buku,
+kembalikan_buku dan daftar_buku_tersedia, serta memori model dengan tracemalloc.
+Hasil ditulis sebagai JSON agar bisa dibandingkan antar perubahan indeks/penyimpanan.
+
+Penggunaan:
+    python benchmark_perpustakaan.py [--skala 1000 10000 ...] [--penyimpanan tanpa|sqlite|jurnal]
+                                     [--sampel N] [--output hasil.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from perpustakaan import Buku, Pelanggan, Perpustakaan
+
+SKALA_BAWAAN = (1000, 10000, 100000, 1000000)
+
+
+def buat_buku(jumlah, rng):
+    for i in range(jumlah):
+        yield Buku(f"Judul {rng.randrange(jumlah)} {i}", f"Penulis {i % 1000}", str(i), 1900 + i % 125, 1 + i % 3)
+
+
+def buat_pelanggan(jumlah):
+    for i in range(jumlah):
+        yield Pelanggan(f"P{i}", f"Pelanggan {i}", "Alamat", "0800")
+
+
+def buka_penyimpanan(jenis, folder):
+    if jenis == "sqlite":
+        from penyimpanan import PenyimpananSQLite
+        return PenyimpananSQLite(os.path.join(folder, "benchmark.db"))
+    if jenis == "jurnal":
+        from jurnal import JurnalPerpustakaan
+        return JurnalPerpustakaan(os.path.join(folder, "benchmark.jurnal"))
+    return None
+
+
+def ukur(fungsi, argumen):
+    """Menjalankan fungsi untuk setiap argumen, mengembalikan (hasil, statistik waktu)"""
+    hasil = []
+    mulai = time.perf_counter_ns()
+    for arg in argumen:
+        hasil.append(fungsi(*arg))
+    total = time.perf_counter_ns() - mulai
+    jumlah = len(hasil)
+    return hasil, {
+        "operasi": jumlah,
+        "total_detik": total / 1e9,
+        "ns_per_operasi": total / jumlah if jumlah else 0.0,
+        "operasi_per_detik": jumlah / (total / 1e9) if total else 0.0,
+    }
+
+
+def ukur_memori(jumlah_buku, jumlah_pelanggan, seed):
+    """Memori yang dipakai model (tanpa penyimpanan) untuk katalog sebesar jumlah_buku"""
+    rng = random.Random(seed)
+    tracemalloc.start()
+    try:
+        perpustakaan = Perpustakaan()
+        awal, _ = tracemalloc.get_traced_memory()
+        perpustakaan.tambah_banyak_buku(list(buat_buku(jumlah_buku, rng)))
+        perpustakaan.tambah_banyak_pelanggan(list(buat_pelanggan(jumlah_pelanggan)))
+        sekarang, puncak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    terpakai = sekarang - awal
+    return {
+        "byte_terpakai": terpakai,
+        "byte_puncak": puncak - awal,
+        "byte_per_buku": terpakai / jumlah_buku,
+    }
+
+
+def jalankan_skala(jumlah_buku, jenis_penyimpanan, sampel, seed):
+    rng = random.Random(seed)
+    jumlah_pelanggan = max(10, jumlah_buku // 10)
+    sampel = min(sampel, jumlah_buku)
+    hasil = {"jumlah_buku": jumlah_buku, "jumlah_pelanggan": jumlah_pelanggan, "operasi": {}}
+
+    with tempfile.TemporaryDirectory() as folder:
+        perpustakaan = Perpustakaan(buka_penyimpanan(jenis_penyimpanan, folder))
+        try:
+            perpustakaan.tambah_banyak_pelanggan(list(buat_pelanggan(jumlah_pelanggan)))
+
+            # Buku ditambah satu per satu agar biaya per tambah_buku terukur
+            daftar_buku = list(buat_buku(jumlah_buku, rng))
+            _, hasil["operasi"]["tambah_buku"] = ukur(perpustakaan.tambah_buku, ((b,) for b in daftar_buku))
+            perpustakaan.simpan()
+
+            isbn_acak = [(str(rng.randrange(jumlah_buku)),) for _ in range(sampel)]
+            _, hasil["operasi"]["cari_buku_berdasarkan_isbn"] = ukur(
+                perpustakaan.cari_buku_berdasarkan_isbn, isbn_acak)
+
+            # Setiap pinjaman memakai buku berbeda agar semuanya berhasil
+            isbn_pinjam = rng.sample(range(jumlah_buku), sampel)
+            argumen_pinjam = [(f"P{rng.randrange(jumlah_pelanggan)}", str(isbn)) for isbn in isbn_pinjam]
+            hasil_pinjam, hasil["operasi"]["pinjam_buku"] = ukur(perpustakaan.pinjam_buku, argumen_pinjam)
+
+            daftar_id = [(id_transaksi,) for sukses, id_transaksi in hasil_pinjam if sukses]
+            rng.shuffle(daftar_id)
+            _, hasil["operasi"]["kembalikan_buku"] = ukur(perpustakaan.kembalikan_buku, daftar_id)
+
+            # Daftar lengkap berukuran O(n), jadi cukup diulang beberapa kali
+            ulang = max(1, min(100, 1000000 // jumlah_buku))
+            _, hasil["operasi"]["daftar_buku_tersedia"] = ukur(perpustakaan.daftar_buku_tersedia, [()] * ulang)
+        finally:
+            perpustakaan.tutup()
+
+    hasil["memori"] = ukur_memori(jumlah_buku, jumlah_pelanggan, seed)
+    return hasil
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark operasi Perpustakaan")
+    parser.add_argument("--skala", type=int, nargs="+", default=list(SKALA_BAWAAN),
+                        help="jumlah buku per percobaan (bawaan: %(default)s)")
+    parser.add_argument("--penyimpanan", choices=("tanpa", "sqlite", "jurnal"), default="tanpa")
+    parser.add_argument("--sampel", type=int, default=10000,
+                        help="jumlah operasi cari/pinjam/kembalikan per skala (bawaan: %(default)s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="tulis JSON ke berkas ini (bawaan: stdout)")
+    args = parser.parse_args(argv)
+
+    laporan = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "penyimpanan": args.penyimpanan,
+        "seed": args.seed,
+        "hasil": [],
+    }
+    for jumlah_buku in args.skala:
+        hasil = jalankan_skala(jumlah_buku, args.penyimpanan, args.sampel, args.seed)
+        laporan["hasil"].append(hasil)
+        # Ringkasan singkat ke stderr supaya JSON di stdout tetap bersih
+        ringkas = ", ".join(f"{nama} {o['ns_per_operasi'] / 1000:.2f} us" for nama, o in hasil["operasi"].items())
+        print(f"{jumlah_buku:>8} buku: {ringkas}, {hasil['memori']['byte_per_buku']:.0f} B/buku", file=sys.stderr)
+
+    teks = json.dumps(laporan, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(teks + "\n")
+    else:
+        print(teks)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
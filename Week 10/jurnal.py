@@ -0,0 +1,264 @@
+import os
+import pickle
+import re
+import threading
+from datetime import date
+
+# Format satu baris jurnal (dipisah tab):
+#   B  isbn  judul  penulis  tahun_terbit  jumlah_eksemplar   -> tambah buku
+#   E  isbn  jumlah_eksemplar                               -> ubah jumlah eksemplar
+#   P  id  nama  alamat  no_telepon                         -> tambah pelanggan
+#   T  id_transaksi  id_pelanggan  isbn  tgl  eksemplar       -> pinjam buku
+#   K  id_transaksi  status  tgl_dikembalikan                -> perbarui status (kembalikan buku)
+
+_POLA_ESCAPE = re.compile(r"\\(.)")
+_UNESCAPE = {"t": "\t", "n": "\n", "r": "\r", "\\": "\\"}
+
+
+def _escape(nilai):
+    return str(nilai).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _unescape(nilai):
+    return _POLA_ESCAPE.sub(lambda m: _UNESCAPE[m.group(1)], nilai)
+
+
+class JurnalPerpustakaan:
+    """Penyimpanan append-only: setiap perubahan ditulis sebagai satu baris jurnal,
+    dan snapshotter di latar belakang memadatkan jurnal menjadi snapshot biner"""
+
+    # commit() aman dijalankan bersamaan dengan penulisan dari thread lain
+    COMMIT_PARALEL = True
+
+    def __init__(self, path="perpustakaan.jurnal", ukuran_batch=500, interval_snapshot=60, minimal_baris=1000):
+        self.path = path
+        self.path_lama = path + ".lama"
+        self.path_snapshot = path + ".snap"
+        self.ukuran_batch = ukuran_batch
+        self.interval_snapshot = interval_snapshot
+        self.minimal_baris = minimal_baris
+
+        self.jumlah_tertunda = 0
+        self.baris_sejak_snapshot = 0
+        self.keadaan = None
+        self._kunci = threading.Lock()
+
+        # Pemadatan yang terputus (aplikasi mati di tengah snapshot) diselesaikan dulu
+        if os.path.exists(self.path_lama):
+            self.padatkan_jurnal_lama()
+
+        # Baris terakhir yang terpotong dibuang agar baris baru tidak tersambung ke ujungnya
+        self._potong_baris_terpotong(self.path)
+        self.berkas = self._buka_jurnal()
+
+        self._berhenti = threading.Event()
+        self._snapshotter = threading.Thread(target=self._jalankan_snapshotter, daemon=True)
+        self._snapshotter.start()
+
+    def _buka_jurnal(self):
+        # newline="\n": tanpa terjemahan akhir baris, jadi hanya "\n" yang mengakhiri baris
+        return open(self.path, "a", encoding="utf-8", newline="\n")
+
+    @staticmethod
+    def _potong_baris_terpotong(path, ukuran_blok=4096):
+        """Memotong berkas sampai tepat setelah baris lengkap terakhir"""
+        if not os.path.exists(path):
+            return
+        with open(path, "r+b") as f:
+            akhir = f.seek(0, os.SEEK_END)
+            posisi = akhir
+            while posisi > 0:
+                awal = max(0, posisi - ukuran_blok)
+                f.seek(awal)
+                indeks = f.read(posisi - awal).rfind(b"\n")
+                if indeks >= 0:
+                    posisi = awal + indeks + 1
+                    break
+                posisi = awal
+            if posisi < akhir:
+                f.truncate(posisi)
+                f.flush()
+                os.fsync(f.fileno())
+
+    # ---------- Penulisan ----------
+
+    def _tulis(self, *kolom):
+        self._tulis_banyak([kolom])
+
+    def _tulis_banyak(self, daftar_kolom):
+        # Satu batch diformat dulu lalu ditulis dengan satu write, sehingga commit dari
+        # thread lain tidak pernah membuat permanen hanya sebagian batch
+        teks = "".join("\t".join(_escape(k) for k in kolom) + "\n" for kolom in daftar_kolom)
+        with self._kunci:
+            self.berkas.write(teks)
+            self.baris_sejak_snapshot += len(daftar_kolom)
+            self.jumlah_tertunda += len(daftar_kolom)
+            penuh = self.jumlah_tertunda >= self.ukuran_batch
+        if penuh:
+            self.commit()
+
+    @staticmethod
+    def _kolom_buku(buku):
+        return "B", buku.isbn, buku.judul, buku.penulis, buku.tahun_terbit, buku.jumlah_eksemplar
+
+    @staticmethod
+    def _kolom_pelanggan(pelanggan):
+        return "P", pelanggan.id_pelanggan, pelanggan.nama, pelanggan.alamat, pelanggan.no_telepon
+
+    @staticmethod
+    def _kolom_transaksi(transaksi):
+        return ("T", transaksi.id_transaksi, transaksi.pelanggan.id_pelanggan, transaksi.buku.isbn,
+                transaksi.tanggal_pinjam.isoformat(), transaksi.eksemplar)
+
+    @staticmethod
+    def _kolom_status(transaksi):
+        tanggal_dikembalikan = transaksi.tanggal_dikembalikan
+        return ("K", transaksi.id_transaksi, transaksi.status,
+                tanggal_dikembalikan.isoformat() if tanggal_dikembalikan else "")
+
+    def simpan_buku(self, buku):
+        self._tulis(*self._kolom_buku(buku))
+
+    def simpan_banyak_buku(self, daftar_buku):
+        self._tulis_banyak([self._kolom_buku(buku) for buku in daftar_buku])
+
+    def simpan_pelanggan(self, pelanggan):
+        self._tulis(*self._kolom_pelanggan(pelanggan))
+
+    def simpan_banyak_pelanggan(self, daftar_pelanggan):
+        self._tulis_banyak([self._kolom_pelanggan(pelanggan) for pelanggan in daftar_pelanggan])
+
+    def simpan_banyak_transaksi(self, daftar_transaksi):
+        self._tulis_banyak([self._kolom_transaksi(transaksi) for transaksi in daftar_transaksi])
+
+    def perbarui_jumlah_eksemplar(self, isbn, jumlah_eksemplar):
+        self._tulis("E", isbn, jumlah_eksemplar)
+
+    def perbarui_banyak_status(self, daftar_transaksi):
+        self._tulis_banyak([self._kolom_status(transaksi) for transaksi in daftar_transaksi])
+
+    def commit(self):
+        with self._kunci:
+            self.berkas.flush()
+            self.jumlah_tertunda = 0
+            # fsync memakai salinan descriptor agar tetap sah walau berkas diputar oleh snapshot
+            fd = os.dup(self.berkas.fileno())
+        # fsync di luar kunci: baris baru tetap bisa ditulis selama menunggu disk
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    # ---------- Snapshot dan replay ----------
+
+    @staticmethod
+    def _keadaan_kosong():
+        return {"buku": {}, "pelanggan": {}, "transaksi": {}}
+
+    def _baca_snapshot(self):
+        if not os.path.exists(self.path_snapshot):
+            return self._keadaan_kosong()
+        with open(self.path_snapshot, "rb") as f:
+            return pickle.load(f)
+
+    @staticmethod
+    def _replay(keadaan, path):
+        """Menerapkan jurnal ke keadaan dan mengembalikan jumlah baris yang diterapkan"""
+        jumlah = 0
+        if not os.path.exists(path):
+            return jumlah
+        # Hanya "\n" yang memisahkan baris; "\r" di dalam nilai tidak memotong record
+        with open(path, "r", encoding="utf-8", newline="\n") as f:
+            for baris in f:
+                # Baris terakhir yang terpotong (belum selesai ditulis) diabaikan
+                if not baris.endswith("\n"):
+                    break
+                kolom = [_unescape(k) for k in baris[:-1].split("\t")]
+                jenis = kolom[0]
+                if jenis == "B":
+                    keadaan["buku"][kolom[1]] = (kolom[1], kolom[2], kolom[3], int(kolom[4]), int(kolom[5]))
+                elif jenis == "E":
+                    keadaan["buku"][kolom[1]] = keadaan["buku"][kolom[1]][:4] + (int(kolom[2]),)
+                elif jenis == "P":
+                    keadaan["pelanggan"][kolom[1]] = tuple(kolom[1:5])
+                elif jenis == "T":
+                    keadaan["transaksi"][kolom[1]] = [kolom[1], kolom[2], kolom[3], kolom[4], "Dipinjam",
+                                                      int(kolom[5]), ""]
+                elif jenis == "K":
+                    transaksi = keadaan["transaksi"][kolom[1]]
+                    transaksi[4] = kolom[2]
+                    transaksi[6] = kolom[3]
+                jumlah += 1
+        return jumlah
+
+    def _tulis_snapshot(self, keadaan):
+        path_sementara = self.path_snapshot + ".tmp"
+        with open(path_sementara, "wb") as f:
+            pickle.dump(keadaan, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path_sementara, self.path_snapshot)
+
+    def padatkan_jurnal_lama(self):
+        """Menggabungkan snapshot terakhir dengan jurnal lama menjadi snapshot baru"""
+        keadaan = self._baca_snapshot()
+        self._replay(keadaan, self.path_lama)
+        self._tulis_snapshot(keadaan)
+        os.remove(self.path_lama)
+
+    def buat_snapshot(self):
+        # Jurnal aktif diputar di bawah kunci; pemadatan berjalan tanpa menahan penulis
+        with self._kunci:
+            if self.baris_sejak_snapshot == 0:
+                return
+            self.berkas.flush()
+            os.fsync(self.berkas.fileno())
+            self.berkas.close()
+            os.replace(self.path, self.path_lama)
+            self.berkas = self._buka_jurnal()
+            self.baris_sejak_snapshot = 0
+        self.padatkan_jurnal_lama()
+
+    def _jalankan_snapshotter(self):
+        while not self._berhenti.wait(self.interval_snapshot):
+            if self.baris_sejak_snapshot >= self.minimal_baris:
+                self.buat_snapshot()
+
+    # ---------- Pemuatan ----------
+
+    def _muat_keadaan(self):
+        if self.keadaan is None:
+            self.keadaan = self._baca_snapshot()
+            # Ekor jurnal yang sudah ada ikut dihitung untuk pemicu snapshot berikutnya
+            with self._kunci:
+                self.baris_sejak_snapshot += self._replay(self.keadaan, self.path)
+        return self.keadaan
+
+    def muat_buku(self):
+        """Menghasilkan baris (isbn, judul, penulis, tahun_terbit, jumlah_eksemplar) sesuai urutan penambahan"""
+        return iter(self._muat_keadaan()["buku"].values())
+
+    def muat_pelanggan(self):
+        """Menghasilkan baris (id_pelanggan, nama, alamat, no_telepon) sesuai urutan penambahan"""
+        return iter(self._muat_keadaan()["pelanggan"].values())
+
+    def muat_transaksi(self):
+        """Menghasilkan baris (id_transaksi, id_pelanggan, isbn, eksemplar, tanggal_pinjam, status,
+        tanggal_dikembalikan) sesuai urutan peminjaman"""
+        keadaan = self._muat_keadaan()
+        for id_transaksi, id_pelanggan, isbn, tanggal_pinjam, status, eksemplar, tanggal_dikembalikan \
+                in keadaan["transaksi"].values():
+            yield (id_transaksi, id_pelanggan, isbn, eksemplar, date.fromisoformat(tanggal_pinjam), status,
+                   date.fromisoformat(tanggal_dikembalikan) if tanggal_dikembalikan else None)
+        # Keadaan hasil replay tidak dibutuhkan lagi setelah cache terisi
+        self.keadaan = None
+
+    def tutup(self):
+        self._berhenti.set()
+        self._snapshotter.join()
+        # Proses berumur pendek (misalnya satu perintah CLI) tidak pernah mencapai interval
+        # snapshotter, jadi jurnal dipadatkan di sini agar waktu start berikutnya tetap terbatas
+        if self.baris_sejak_snapshot >= self.minimal_baris:
+            self.buat_snapshot()
+        self.commit()
+        self.berkas.close()
@@ -0,0 +1,190 @@
+import sqlite3
+import uuid
+from datetime import date
+
+
+class PenyimpananSQLite:
+    """Penyimpanan permanen Buku, Pelanggan dan Transaksi berbasis SQLite"""
+
+    SKEMA = """
+        CREATE TABLE IF NOT EXISTS buku (
+            isbn TEXT PRIMARY KEY,
+            judul TEXT NOT NULL,
+            penulis TEXT NOT NULL,
+            tahun_terbit INTEGER NOT NULL,
+            jumlah_eksemplar INTEGER NOT NULL CHECK (jumlah_eksemplar >= 1)
+        );
+        CREATE TABLE IF NOT EXISTS pelanggan (
+            id_pelanggan TEXT PRIMARY KEY,
+            nama TEXT NOT NULL,
+            alamat TEXT NOT NULL,
+            no_telepon TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS transaksi (
+            id_transaksi TEXT PRIMARY KEY,
+            id_pelanggan TEXT NOT NULL,
+            isbn TEXT NOT NULL,
+            eksemplar INTEGER NOT NULL,
+            tanggal_pinjam TEXT NOT NULL,
+            tanggal_kembali TEXT NOT NULL,
+            status TEXT NOT NULL,
+            tanggal_dikembalikan TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_transaksi_pelanggan ON transaksi(id_pelanggan);
+        CREATE INDEX IF NOT EXISTS idx_transaksi_isbn ON transaksi(isbn);
+        CREATE INDEX IF NOT EXISTS idx_transaksi_status ON transaksi(status);
+        CREATE INDEX IF NOT EXISTS idx_transaksi_jatuh_tempo ON transaksi(tanggal_kembali);
+    """
+
+    # Query dibuat konstan agar di-cache sebagai prepared statement oleh sqlite3
+    SQL_SIMPAN_BUKU = "INSERT INTO buku (isbn, judul, penulis, tahun_terbit, jumlah_eksemplar) VALUES (?, ?, ?, ?, ?)"
+    SQL_SIMPAN_PELANGGAN = "INSERT INTO pelanggan (id_pelanggan, nama, alamat, no_telepon) VALUES (?, ?, ?, ?)"
+    SQL_SIMPAN_TRANSAKSI = ("INSERT INTO transaksi (id_transaksi, id_pelanggan, isbn, eksemplar, tanggal_pinjam, "
+                            "tanggal_kembali, status) VALUES (?, ?, ?, ?, ?, ?, ?)")
+    SQL_PERBARUI_STATUS = "UPDATE transaksi SET status = ?, tanggal_dikembalikan = ? WHERE id_transaksi = ?"
+    SQL_PERBARUI_EKSEMPLAR = "UPDATE buku SET jumlah_eksemplar = ? WHERE isbn = ?"
+
+    def __init__(self, path="perpustakaan.db", ukuran_batch=500):
+        self.path = path
+        self.ukuran_batch = ukuran_batch
+        self.jumlah_tertunda = 0
+
+        # Koneksi boleh dipakai dari beberapa thread; Perpustakaan menyerialkan aksesnya
+        self.koneksi = sqlite3.connect(path, cached_statements=64, check_same_thread=False)
+        self.koneksi.execute("PRAGMA journal_mode=WAL")
+        # FULL: WAL di-fsync setiap commit, sehingga transaksi yang dilaporkan berhasil
+        # tetap ada setelah listrik padam (NORMAL hanya aman dari crash proses)
+        self.koneksi.execute("PRAGMA synchronous=FULL")
+        self.koneksi.executescript(self.SKEMA)
+        self.koneksi.commit()
+
+    def _tandai_perubahan(self, jumlah=1):
+        # Commit dikumpulkan per batch, bukan per baris
+        self.jumlah_tertunda += jumlah
+        if self.jumlah_tertunda >= self.ukuran_batch:
+            self.commit()
+
+    def simpan_buku(self, buku):
+        self.koneksi.execute(self.SQL_SIMPAN_BUKU, (
+            buku.isbn, buku.judul, buku.penulis, buku.tahun_terbit, buku.jumlah_eksemplar))
+        self._tandai_perubahan()
+
+    def _simpan_banyak(self, sql, baris):
+        """executemany secara all-or-nothing: jika satu baris gagal, baris lain dari batch yang sama
+        dibatalkan lewat savepoint, tanpa menyentuh penulisan lain yang belum di-commit"""
+        if not self.koneksi.in_transaction:
+            # Savepoint terluar akan langsung commit saat di-RELEASE, jadi transaksi dibuka dulu
+            self.koneksi.execute("BEGIN")
+        self.koneksi.execute("SAVEPOINT batch")
+        try:
+            self.koneksi.executemany(sql, baris)
+        except BaseException:
+            self.koneksi.execute("ROLLBACK TO batch")
+            raise
+        finally:
+            self.koneksi.execute("RELEASE batch")
+        self._tandai_perubahan(len(baris))
+
+    def simpan_banyak_buku(self, daftar_buku):
+        self._simpan_banyak(self.SQL_SIMPAN_BUKU, [
+            (b.isbn, b.judul, b.penulis, b.tahun_terbit, b.jumlah_eksemplar) for b in daftar_buku])
+
+    def simpan_pelanggan(self, pelanggan):
+        self.koneksi.execute(self.SQL_SIMPAN_PELANGGAN, (
+            pelanggan.id_pelanggan, pelanggan.nama, pelanggan.alamat, pelanggan.no_telepon))
+        self._tandai_perubahan()
+
+    def simpan_banyak_pelanggan(self, daftar_pelanggan):
+        self._simpan_banyak(self.SQL_SIMPAN_PELANGGAN, [
+            (p.id_pelanggan, p.nama, p.alamat, p.no_telepon) for p in daftar_pelanggan])
+
+    def simpan_banyak_transaksi(self, daftar_transaksi):
+        # Satu executemany tanpa auto-commit di tengah batch: semua baris permanen bersama
+        self._simpan_banyak(self.SQL_SIMPAN_TRANSAKSI, [(
+            t.id_transaksi, t.pelanggan.id_pelanggan, t.buku.isbn, t.eksemplar,
+            t.tanggal_pinjam.isoformat(), t.tanggal_kembali.isoformat(), t.status
+        ) for t in daftar_transaksi])
+
+    def perbarui_banyak_status(self, daftar_transaksi):
+        baris = []
+        for t in daftar_transaksi:
+            tanggal_dikembalikan = t.tanggal_dikembalikan
+            baris.append((t.status, tanggal_dikembalikan.isoformat() if tanggal_dikembalikan else None,
+                          t.id_transaksi))
+        self._simpan_banyak(self.SQL_PERBARUI_STATUS, baris)
+
+    def perbarui_jumlah_eksemplar(self, isbn, jumlah_eksemplar):
+        self.koneksi.execute(self.SQL_PERBARUI_EKSEMPLAR, (jumlah_eksemplar, isbn))
+        self._tandai_perubahan()
+
+    def commit(self):
+        self.koneksi.commit()
+        self.jumlah_tertunda = 0
+
+    # ---------- Operasi langsung (tanpa memuat katalog ke memori) ----------
+
+    def pinjam_langsung(self, id_pelanggan, isbn, tanggal_pinjam, tanggal_kembali):
+        """Meminjamkan satu eksemplar langsung di database, untuk proses singkat seperti CLI.
+        Eksemplar bebas bernomor terkecil yang dipakai, sama seperti model setelah dimuat.
+        Jangan dipakai selama database dibuka oleh Perpustakaan di proses lain (misalnya GUI):
+        model di memori proses itu tidak melihat pinjaman ini dan bisa meminjamkan eksemplar yang sama.
+        Mengembalikan (True, id_transaksi) atau (False, pesan_kesalahan)."""
+        with self._transaksi_tulis():
+            if not self.koneksi.execute("SELECT 1 FROM pelanggan WHERE id_pelanggan = ?", (id_pelanggan,)).fetchone():
+                return False, "Pelanggan tidak ditemukan"
+            baris = self.koneksi.execute("SELECT jumlah_eksemplar FROM buku WHERE isbn = ?", (isbn,)).fetchone()
+            if not baris:
+                return False, "Buku tidak ditemukan"
+
+            dipinjam = {eksemplar for (eksemplar,) in self.koneksi.execute(
+                "SELECT eksemplar FROM transaksi WHERE isbn = ? AND status = 'Dipinjam'", (isbn,))}
+            eksemplar = next((e for e in range(1, baris[0] + 1) if e not in dipinjam), None)
+            if eksemplar is None:
+                return False, "Buku tidak tersedia"
+
+            id_transaksi = str(uuid.uuid4())[:8]
+            while self.koneksi.execute("SELECT 1 FROM transaksi WHERE id_transaksi = ?", (id_transaksi,)).fetchone():
+                id_transaksi = str(uuid.uuid4())[:8]
+            self.koneksi.execute(self.SQL_SIMPAN_TRANSAKSI, (
+                id_transaksi, id_pelanggan, isbn, eksemplar,
+                tanggal_pinjam.isoformat(), tanggal_kembali.isoformat(), "Dipinjam"))
+            return True, id_transaksi
+
+    def kembalikan_langsung(self, id_transaksi, tanggal_dikembalikan):
+        """Mengembalikan satu transaksi langsung di database; False jika tidak ada atau sudah dikembalikan"""
+        with self._transaksi_tulis():
+            kursor = self.koneksi.execute(
+                self.SQL_PERBARUI_STATUS + " AND status = 'Dipinjam'",
+                ("Dikembalikan", tanggal_dikembalikan.isoformat(), id_transaksi))
+            return kursor.rowcount == 1
+
+    def _transaksi_tulis(self):
+        # BEGIN IMMEDIATE hanya menyerialkan cek dan tulis antar proses yang memakai operasi langsung
+        # (misalnya dua CLI). GUI memegang eksemplar bebasnya sendiri di memori dan tidak membaca
+        # ulang database, jadi CLI tidak boleh menulis ke database yang sedang dibuka GUI.
+        self.commit()
+        self.koneksi.execute("BEGIN IMMEDIATE")
+        return self.koneksi
+
+    def muat_buku(self):
+        """Menghasilkan baris (isbn, judul, penulis, tahun_terbit, jumlah_eksemplar) sesuai urutan penambahan"""
+        return self.koneksi.execute(
+            "SELECT isbn, judul, penulis, tahun_terbit, jumlah_eksemplar FROM buku ORDER BY rowid")
+
+    def muat_pelanggan(self):
+        """Menghasilkan baris (id_pelanggan, nama, alamat, no_telepon) sesuai urutan penambahan"""
+        return self.koneksi.execute("SELECT id_pelanggan, nama, alamat, no_telepon FROM pelanggan ORDER BY rowid")
+
+    def muat_transaksi(self):
+        """Menghasilkan baris (id_transaksi, id_pelanggan, isbn, eksemplar, tanggal_pinjam, status,
+        tanggal_dikembalikan) sesuai urutan peminjaman"""
+        for id_transaksi, id_pelanggan, isbn, eksemplar, tanggal_pinjam, status, tanggal_dikembalikan in \
+                self.koneksi.execute(
+                    "SELECT id_transaksi, id_pelanggan, isbn, eksemplar, tanggal_pinjam, status, tanggal_dikembalikan "
+                    "FROM transaksi ORDER BY rowid"):
+            yield (id_transaksi, id_pelanggan, isbn, eksemplar, date.fromisoformat(tanggal_pinjam), status,
+                   date.fromisoformat(tanggal_dikembalikan) if tanggal_dikembalikan else None)
+
+    def tutup(self):
+        self.commit()
+        self.koneksi.close()
@@ -0,0 +1,1041 @@
+from datetime import date
+import bisect
+import csv
+from collections import Counter
+from contextlib import ExitStack
+import heapq
+import itertools
+import json
+import os
+import re
+import threading
+import uuid
+
+class Buku:
+    """Satu judul buku beserta eksemplar fisiknya (bernomor 1..jumlah_eksemplar)"""
+
+    # __slots__ menghilangkan __dict__ per objek agar jutaan record tetap hemat memori
+    __slots__ = ("judul", "penulis", "isbn", "tahun_terbit", "jumlah_eksemplar", "eksemplar_bebas")
+
+    def __init__(self, judul, penulis, isbn, tahun_terbit, jumlah_eksemplar=1):
+        if jumlah_eksemplar < 1:
+            raise ValueError("Jumlah eksemplar minimal 1")
+        self.judul = judul
+        self.penulis = penulis
+        self.isbn = isbn
+        self.tahun_terbit = tahun_terbit
+        self.jumlah_eksemplar = jumlah_eksemplar
+        # Stack nomor eksemplar yang sedang tidak dipinjam, pinjam/kembali O(1)
+        self.eksemplar_bebas = list(range(jumlah_eksemplar, 0, -1))
+
+    @property
+    def jumlah_tersedia(self):
+        return len(self.eksemplar_bebas)
+
+    @property
+    def tersedia(self):
+        return bool(self.eksemplar_bebas)
+
+    def ambil_eksemplar(self):
+        return self.eksemplar_bebas.pop()
+
+    def kembalikan_eksemplar(self, nomor):
+        self.eksemplar_bebas.append(nomor)
+
+    def tambah_eksemplar(self, jumlah):
+        awal = self.jumlah_eksemplar + 1
+        self.jumlah_eksemplar += jumlah
+        self.eksemplar_bebas.extend(range(self.jumlah_eksemplar, awal - 1, -1))
+
+    def __str__(self):
+        status = f"Tersedia {self.jumlah_tersedia}/{self.jumlah_eksemplar}" if self.tersedia else "Dipinjam"
+        return f"{self.judul} oleh {self.penulis} ({self.tahun_terbit}) - {status}"
+
+
+class Pelanggan:
+    __slots__ = ("id_pelanggan", "nama", "alamat", "no_telepon", "buku_dipinjam")
+
+    def __init__(self, id_pelanggan, nama, alamat, no_telepon):
+        self.id_pelanggan = id_pelanggan
+        self.nama = nama
+        self.alamat = alamat
+        self.no_telepon = no_telepon
+        self.buku_dipinjam = {}  # id_transaksi -> Buku, agar penghapusan O(1)
+
+    def __str__(self):
+        return f"{self.nama} (ID: {self.id_pelanggan})"
+
+
+class Transaksi:
+    __slots__ = ("id_transaksi", "pelanggan", "buku", "eksemplar", "ordinal_pinjam", "status", "ordinal_dikembalikan")
+
+    LAMA_PINJAM = 14  # Asumsi peminjaman 14 hari
+
+    def __init__(self, id_transaksi, pelanggan, buku, tanggal_pinjam, eksemplar=1):
+        self.id_transaksi = id_transaksi
+        self.pelanggan = pelanggan
+        self.buku = buku
+        self.eksemplar = eksemplar  # Nomor eksemplar fisik yang dipinjam
+        # Tanggal disimpan sebagai ordinal (int), objek date hanya dibuat saat dibutuhkan
+        self.ordinal_pinjam = tanggal_pinjam.toordinal()
+        self.status = "Dipinjam"  # Dipinjam atau Dikembalikan
+        self.ordinal_dikembalikan = None  # Tanggal buku benar-benar dikembalikan
+
+    @property
+    def ordinal_kembali(self):
+        return self.ordinal_pinjam + self.LAMA_PINJAM
+
+    @property
+    def tanggal_pinjam(self):
+        return date.fromordinal(self.ordinal_pinjam)
+
+    @property
+    def tanggal_kembali(self):
+        return date.fromordinal(self.ordinal_kembali)
+
+    @property
+    def tanggal_dikembalikan(self):
+        if self.ordinal_dikembalikan is None:
+            return None
+        return date.fromordinal(self.ordinal_dikembalikan)
+
+    def __str__(self):
+        return f"ID: {self.id_transaksi} - {self.pelanggan.nama} meminjam '{self.buku.judul}' pada {self.tanggal_pinjam.strftime('%d/%m/%Y')} - Status: {self.status}"
+
+
+class IndeksTeks:
+    """Inverted index token -> buku untuk pencarian judul dan penulis dengan prefix"""
+
+    BOBOT_JUDUL = 2
+    BOBOT_PENULIS = 1
+
+    def __init__(self, teks_buku):
+        # teks_buku(isbn) -> (judul, penulis), untuk menilai kandidat tanpa membaca posting token lain
+        self.teks_buku = teks_buku
+        # token -> daftar ISBN per bobot (indeks bobot - 1), sehingga posting sudah terurut
+        # berdasarkan skor dan pencarian cukup membaca bagian teratasnya
+        self.posting = {}
+        # Daftar token terurut untuk mencari rentang prefix dengan bisect.
+        # Token baru ditampung dulu dan digabung saat pencarian berikutnya,
+        # agar penambahan buku tidak perlu menggeser seluruh daftar.
+        self.token_terurut = []
+        self.token_baru = []
+
+    @staticmethod
+    def tokenisasi(teks):
+        return re.findall(r"\w+", teks.lower())
+
+    @classmethod
+    def bobot_token(cls, judul, penulis):
+        """token -> bobot (gabungan bit BOBOT_JUDUL / BOBOT_PENULIS) untuk satu buku"""
+        bobot_token = {}
+        for token in cls.tokenisasi(judul):
+            bobot_token[token] = bobot_token.get(token, 0) | cls.BOBOT_JUDUL
+        for token in cls.tokenisasi(penulis):
+            bobot_token[token] = bobot_token.get(token, 0) | cls.BOBOT_PENULIS
+        return bobot_token
+
+    def tambah(self, buku):
+        for token, bobot in self.bobot_token(buku.judul, buku.penulis).items():
+            daftar = self.posting.get(token)
+            if daftar is None:
+                daftar = self.posting[token] = ([], [], [])
+                self.token_baru.append(token)
+            daftar[bobot - 1].append(buku.isbn)
+
+    def _rentang_token(self, token_kueri):
+        """Semua token di indeks yang diawali token_kueri"""
+        if self.token_baru:
+            # Timsort menggabungkan dua rentang terurut dalam waktu hampir linear
+            self.token_baru.sort()
+            self.token_terurut.extend(self.token_baru)
+            self.token_terurut.sort()
+            self.token_baru = []
+        awal = bisect.bisect_left(self.token_terurut, token_kueri)
+        akhir = bisect.bisect_left(self.token_terurut, token_kueri + "\uffff")
+        return self.token_terurut[awal:akhir]
+
+    @staticmethod
+    def _skor(token_kueri, bobot_token):
+        # Kecocokan persis bernilai dua kali kecocokan prefix; 0 jika tidak ada token yang cocok
+        return max((bobot * (2 if token == token_kueri else 1)
+                    for token, bobot in bobot_token.items() if token.startswith(token_kueri)), default=0)
+
+    def _tingkat(self, token_kueri, rentang):
+        """[(skor, [posting, ...])] untuk token_kueri, dari skor tertinggi"""
+        persis = self.posting.get(token_kueri)
+        prefix = [self.posting[t] for t in rentang if t != token_kueri]
+        tingkat = []
+        for bobot in (3, 2, 1):
+            if persis:
+                tingkat.append((2 * bobot, [persis[bobot - 1]]))
+            tingkat.append((bobot, [daftar[bobot - 1] for daftar in prefix]))
+        tingkat.sort(key=lambda item: item[0], reverse=True)
+        return tingkat
+
+    def _kandidat(self, token_kueri, rentang):
+        """(skor, isbn) setiap buku yang cocok dengan token_kueri, dari skor tertinggi.
+        Setiap buku dihasilkan sekali, dengan skor terbaiknya."""
+        dilihat = set()
+        for skor, daftar_posting in self._tingkat(token_kueri, rentang):
+            for posting in daftar_posting:
+                for isbn in posting:
+                    if isbn not in dilihat:
+                        dilihat.add(isbn)
+                        yield skor, isbn
+
+    def _peta_skor(self, token_kueri, rentang):
+        """isbn -> skor terbaik untuk token_kueri; skor rendah diisi dulu lalu ditimpa yang lebih tinggi"""
+        peta = {}
+        for skor, daftar_posting in reversed(self._tingkat(token_kueri, rentang)):
+            for posting in daftar_posting:
+                peta.update(dict.fromkeys(posting, skor))
+        return peta
+
+    def cari(self, kueri, batas=50):
+        """Mengembalikan ISBN buku yang cocok dengan semua token kueri, diurutkan berdasarkan skor.
+
+        Posting token kueri paling selektif dibaca dari skor tertinggi, dan setiap kandidat
+        dinilai dari teks bukunya sendiri untuk token kueri lainnya. Pembacaan berhenti begitu
+        kandidat berikutnya tidak mungkin lagi masuk `batas` hasil terbaik, jadi kueri satu huruf
+        hanya membaca sekitar `batas` entri, bukan seluruh rentang prefix. Jika batas itu lama
+        tidak tercapai, skor token lain diambil dari peta yang dibangun dari posting mereka.
+        """
+        token_kueri = self.tokenisasi(kueri)
+        if not token_kueri or batas <= 0:
+            return []
+
+        # Token kueri paling selektif (posting terkecil) menjadi sumber kandidat
+        rencana = []
+        for token in token_kueri:
+            rentang = self._rentang_token(token)
+            ukuran, maksimal = 0, 0
+            for t in rentang:
+                for bobot, daftar in enumerate(self.posting[t], start=1):
+                    if daftar:
+                        ukuran += len(daftar)
+                        maksimal = max(maksimal, bobot * (2 if t == token else 1))
+            if not ukuran:
+                return []
+            rencana.append((ukuran, token, rentang, maksimal))
+        rencana.sort(key=lambda r: r[0])
+        _, token, rentang, _ = rencana[0]
+        token_lain = [(t, r) for _, t, r, _ in rencana[1:]]
+        # Skor tertinggi yang masih bisa disumbang token lain, dari isi indeks saat ini
+        sisa_maksimal = sum(maksimal for _, _, _, maksimal in rencana[1:])
+        # Menilai satu kandidat dari teksnya kira-kira semahal membaca puluhan entri posting,
+        # jadi setelah sebanyak ini kandidat, membangun peta skor token lain lebih murah
+        batas_periksa_teks = sum(ukuran for ukuran, _, _, _ in rencana[1:]) // 32
+
+        # Min-heap (skor, -urutan, isbn): akarnya hasil terburuk, skor sama dimenangkan yang lebih dulu
+        terbaik = []
+        peta_lain = None
+        for urutan, (skor, isbn) in enumerate(self._kandidat(token, rentang)):
+            # Skor kandidat menurun, jadi kandidat ini dan sesudahnya paling tinggi skor + sisa_maksimal
+            if len(terbaik) == batas and terbaik[0][0] >= skor + sisa_maksimal:
+                break
+            if token_lain:
+                if peta_lain is None and urutan >= batas_periksa_teks:
+                    peta_lain = [self._peta_skor(t, r) for t, r in token_lain]
+                if peta_lain is None:
+                    bobot_token = self.bobot_token(*self.teks_buku(isbn))
+                    nilai = [self._skor(t, bobot_token) for t, _ in token_lain]
+                else:
+                    nilai = [peta.get(isbn, 0) for peta in peta_lain]
+                if not all(nilai):
+                    continue
+                skor += sum(nilai)
+            item = (skor, -urutan, isbn)
+            if len(terbaik) < batas:
+                heapq.heappush(terbaik, item)
+            elif item > terbaik[0]:
+                heapq.heapreplace(terbaik, item)
+
+        return [isbn for _, _, isbn in sorted(terbaik, reverse=True)]
+
+
+def baca_teks(path, status):
+    """Membaca berkas baris per baris sambil mencatat jumlah byte yang sudah dibaca"""
+    with open(path, "rb") as f:
+        for baris in f:
+            status["byte"] += len(baris)
+            yield baris.decode("utf-8-sig" if status["byte"] == len(baris) else "utf-8")
+
+
+EKSTENSI_JSON_LINES = (".jsonl", ".ndjson")
+
+
+def baca_berkas(path, status):
+    """Menghasilkan record (dict) dari berkas CSV, JSON-lines atau array JSON (.json).
+    CSV dan JSON-lines dibaca streaming; array JSON harus dimuat utuh."""
+    nama = path.lower()
+    if nama.endswith(EKSTENSI_JSON_LINES):
+        for baris in baca_teks(path, status):
+            if not baris.strip():
+                continue
+            try:
+                yield json.loads(baris)
+            except ValueError:
+                # Baris rusak diteruskan sebagai None agar ditolak validator, seperti baris CSV yang cacat
+                yield None
+    elif nama.endswith(".json"):
+        with open(path, "r", encoding="utf-8-sig") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise ValueError(f"{path} harus berisi array JSON")
+        status["byte"] = os.path.getsize(path)
+        yield from data
+    else:
+        yield from csv.DictReader(baca_teks(path, status))
+
+
+def tulis_berkas(path, kolom, baris):
+    """Menulis baris (tuple sesuai kolom) ke berkas CSV, JSON-lines atau array JSON, mengembalikan jumlah baris"""
+    jumlah = 0
+    nama = path.lower()
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if nama.endswith(EKSTENSI_JSON_LINES):
+            for nilai in baris:
+                f.write(json.dumps(dict(zip(kolom, nilai)), ensure_ascii=False) + "\n")
+                jumlah += 1
+        elif nama.endswith(".json"):
+            # Array ditulis per elemen agar data tidak perlu dikumpulkan dulu di memori
+            f.write("[")
+            for nilai in baris:
+                f.write(("," if jumlah else "") + "\n  " + json.dumps(dict(zip(kolom, nilai)), ensure_ascii=False))
+                jumlah += 1
+            f.write("\n]\n")
+        else:
+            penulis = csv.writer(f)
+            penulis.writerow(kolom)
+            for nilai in baris:
+                penulis.writerow(nilai)
+                jumlah += 1
+    return jumlah
+
+
+def _teks_wajib(nilai):
+    """Nilai kolom teks hasil impor; null JSON, angka, atau teks kosong menimbulkan ValueError"""
+    if not isinstance(nilai, str) or not nilai.strip():
+        raise ValueError(f"Harus berupa teks yang tidak kosong: {nilai!r}")
+    return nilai
+
+
+def per_batch(data, ukuran):
+    iterator = iter(data)
+    while True:
+        batch = list(itertools.islice(iterator, ukuran))
+        if not batch:
+            return
+        yield batch
+
+
+class PeringkatTeratas:
+    """Menjaga k kunci dengan hitungan terbesar secara inkremental.
+
+    Hitungan hanya pernah bertambah, sehingga kunci di luar peringkat hanya bisa masuk
+    tepat saat hitungannya dinaikkan melewati anggota terkecil.
+    """
+
+    def __init__(self, k=10):
+        self.k = k
+        self.anggota = {}
+
+    def naikkan(self, kunci, hitungan):
+        if kunci in self.anggota or len(self.anggota) < self.k:
+            self.anggota[kunci] = hitungan
+            return
+        terkecil = min(self.anggota, key=self.anggota.get)
+        if hitungan > self.anggota[terkecil]:
+            del self.anggota[terkecil]
+            self.anggota[kunci] = hitungan
+
+    def teratas(self):
+        return sorted(self.anggota.items(), key=lambda item: item[1], reverse=True)
+
+
+class LaporanPerpustakaan:
+    """Statistik peminjaman yang diperbarui setiap pinjam/kembali, bukan dihitung ulang dari riwayat"""
+
+    def __init__(self, k=10):
+        self.pinjam_per_hari = Counter()     # ordinal tanggal -> jumlah
+        self.pinjam_per_bulan = Counter()    # (tahun, bulan) -> jumlah
+        self.pinjam_per_buku = Counter()     # isbn -> jumlah
+        self.pinjam_per_pelanggan = Counter()  # id_pelanggan -> jumlah
+        self.buku_teratas = PeringkatTeratas(k)
+        self.peminjam_teratas = PeringkatTeratas(k)
+
+        # Pinjaman aktif per tanggal jatuh tempo, kuncinya dijaga terurut untuk bisect
+        self.jatuh_tempo = Counter()
+        self.tanggal_jatuh_tempo = []
+
+        self.jumlah_aktif = 0
+        self.jumlah_dikembalikan = 0
+        self.total_hari_pinjam = 0
+
+    def catat_pinjam(self, transaksi):
+        tanggal = transaksi.tanggal_pinjam
+        self.pinjam_per_hari[transaksi.ordinal_pinjam] += 1
+        self.pinjam_per_bulan[tanggal.year, tanggal.month] += 1
+
+        isbn = transaksi.buku.isbn
+        self.pinjam_per_buku[isbn] += 1
+        self.buku_teratas.naikkan(isbn, self.pinjam_per_buku[isbn])
+
+        id_pelanggan = transaksi.pelanggan.id_pelanggan
+        self.pinjam_per_pelanggan[id_pelanggan] += 1
+        self.peminjam_teratas.naikkan(id_pelanggan, self.pinjam_per_pelanggan[id_pelanggan])
+
+        jatuh_tempo = transaksi.ordinal_kembali
+        if jatuh_tempo not in self.jatuh_tempo:
+            bisect.insort(self.tanggal_jatuh_tempo, jatuh_tempo)
+        self.jatuh_tempo[jatuh_tempo] += 1
+        self.jumlah_aktif += 1
+
+    def catat_kembali(self, transaksi):
+        jatuh_tempo = transaksi.ordinal_kembali
+        self.jatuh_tempo[jatuh_tempo] -= 1
+        if self.jatuh_tempo[jatuh_tempo] == 0:
+            del self.jatuh_tempo[jatuh_tempo]
+            del self.tanggal_jatuh_tempo[bisect.bisect_left(self.tanggal_jatuh_tempo, jatuh_tempo)]
+        self.jumlah_aktif -= 1
+
+        if transaksi.ordinal_dikembalikan is not None:
+            self.jumlah_dikembalikan += 1
+            self.total_hari_pinjam += transaksi.ordinal_dikembalikan - transaksi.ordinal_pinjam
+
+    def jumlah_terlambat(self, hari_ini=None):
+        """Jumlah pinjaman aktif yang sudah lewat jatuh tempo"""
+        hari_ini = (hari_ini or date.today()).toordinal()
+        batas = bisect.bisect_left(self.tanggal_jatuh_tempo, hari_ini)
+        return sum(self.jatuh_tempo[tanggal] for tanggal in self.tanggal_jatuh_tempo[:batas])
+
+    def rata_rata_lama_pinjam(self):
+        if not self.jumlah_dikembalikan:
+            return 0.0
+        return self.total_hari_pinjam / self.jumlah_dikembalikan
+
+    def pinjam_harian(self, jumlah_hari=30, hari_ini=None):
+        """Daftar (tanggal, jumlah) untuk beberapa hari terakhir"""
+        akhir = (hari_ini or date.today()).toordinal()
+        return [(date.fromordinal(o), self.pinjam_per_hari.get(o, 0))
+                for o in range(akhir - jumlah_hari + 1, akhir + 1)]
+
+    def pinjam_bulanan(self):
+        return sorted(self.pinjam_per_bulan.items())
+
+
+class CommitGrup:
+    """Group commit untuk penyimpanan permanen yang dipakai beberapa thread.
+
+    Setiap penulisan mendapat nomor urut. Thread yang menunggu commit memimpin satu
+    commit (SQLite commit / fsync jurnal) jika belum ada yang berjalan; satu commit itu
+    membuat permanen semua penulisan yang masuk sebelumnya, sehingga thread lain yang
+    menunggu tidak perlu commit sendiri.
+    """
+
+    def __init__(self, penyimpanan):
+        self.penyimpanan = penyimpanan
+        # Menyerialkan semua pemanggilan ke penyimpanan (koneksi SQLite / berkas jurnal)
+        self.kunci_tulis = threading.Lock()
+        self.kondisi = threading.Condition()
+        self.nomor_tulis = 0
+        self.nomor_commit = 0
+        self.sedang_commit = False
+        self.jumlah_commit = 0
+
+    def tulis(self, fungsi, *argumen):
+        """Menjalankan satu penulisan ke penyimpanan, mengembalikan nomor urutnya"""
+        with self.kunci_tulis:
+            fungsi(*argumen)
+            self.nomor_tulis += 1
+            return self.nomor_tulis
+
+    def tunggu(self, nomor):
+        """Kembali setelah penulisan bernomor `nomor` (dan semua sebelumnya) sudah di-commit"""
+        with self.kondisi:
+            while self.nomor_commit < nomor and self.sedang_commit:
+                self.kondisi.wait()
+            if self.nomor_commit >= nomor:
+                return
+            self.sedang_commit = True
+
+        selesai = 0
+        try:
+            if getattr(self.penyimpanan, "COMMIT_PARALEL", False):
+                # Penulisan lain boleh masuk selama fsync dan ikut commit berikutnya
+                terakhir = self.nomor_tulis
+                self.penyimpanan.commit()
+            else:
+                with self.kunci_tulis:
+                    terakhir = self.nomor_tulis
+                    self.penyimpanan.commit()
+            selesai = terakhir
+            self.jumlah_commit += 1
+        finally:
+            with self.kondisi:
+                self.sedang_commit = False
+                self.nomor_commit = max(self.nomor_commit, selesai)
+                self.kondisi.notify_all()
+
+    def commit(self):
+        self.tunggu(self.nomor_tulis)
+
+
+class Perpustakaan:
+    # Jumlah kunci (striped lock) untuk buku dan pelanggan
+    JUMLAH_KUNCI = 64
+
+    def __init__(self, penyimpanan=None):
+        self.koleksi_buku = []
+        self.daftar_pelanggan = []
+        self.transaksi = []
+
+        # Indeks untuk pencarian O(1) berdasarkan kunci
+        self.indeks_buku = {}
+        self.indeks_pelanggan = {}
+        self.indeks_transaksi = {}
+        # Indeks teks dan laporan baru dibangun saat pertama dipakai, agar pemuatan
+        # (misalnya satu perintah CLI) tidak membayar biaya yang tidak dibutuhkannya
+        self.indeks_teks = None
+        self.laporan = None
+        # Judul yang masih punya eksemplar bebas (dict dipakai sebagai set terurut)
+        self.buku_tersedia = {}
+        # Indeks transaksi untuk laporan berhalaman (semua daftar terurut kronologis)
+        self.transaksi_per_pelanggan = {}
+        self.transaksi_aktif = {}
+
+        # Satu buku/pelanggan selalu dijaga kunci yang sama (dipilih dari hash kuncinya),
+        # sehingga beberapa meja layanan bisa meminjamkan buku berbeda secara paralel.
+        # Urutan penguncian selalu: buku -> pelanggan -> data, agar tidak terjadi deadlock.
+        self.kunci_buku = [threading.Lock() for _ in range(self.JUMLAH_KUNCI)]
+        self.kunci_pelanggan = [threading.Lock() for _ in range(self.JUMLAH_KUNCI)]
+        # Hanya menjaga daftar/indeks bersama di memori, tidak pernah dipegang saat menulis ke disk
+        self.kunci_data = threading.Lock()
+
+        # Objek di memori menjadi cache dari penyimpanan permanen (jika ada)
+        self.penyimpanan = penyimpanan
+        self.commit_grup = CommitGrup(penyimpanan) if penyimpanan else None
+        if self.penyimpanan:
+            self.muat_dari_penyimpanan()
+
+    def muat_dari_penyimpanan(self):
+        for isbn, judul, penulis, tahun_terbit, jumlah_eksemplar in self.penyimpanan.muat_buku():
+            buku = Buku(judul, penulis, isbn, tahun_terbit, jumlah_eksemplar)
+            self.koleksi_buku.append(buku)
+            self.indeks_buku[isbn] = buku
+
+        for id_pelanggan, nama, alamat, no_telepon in self.penyimpanan.muat_pelanggan():
+            pelanggan = Pelanggan(id_pelanggan, nama, alamat, no_telepon)
+            self.daftar_pelanggan.append(pelanggan)
+            self.indeks_pelanggan[id_pelanggan] = pelanggan
+
+        for (id_transaksi, id_pelanggan, isbn, eksemplar, tanggal_pinjam, status,
+             tanggal_dikembalikan) in self.penyimpanan.muat_transaksi():
+            pelanggan = self.indeks_pelanggan[id_pelanggan]
+            buku = self.indeks_buku[isbn]
+            transaksi = Transaksi(id_transaksi, pelanggan, buku, tanggal_pinjam, eksemplar)
+            transaksi.status = status
+            if tanggal_dikembalikan:
+                transaksi.ordinal_dikembalikan = tanggal_dikembalikan.toordinal()
+            self._indeks_transaksi_baru(transaksi)
+
+            # Eksemplar bebas dan pinjaman pelanggan diturunkan dari transaksi yang masih aktif
+            if status == "Dipinjam":
+                buku.eksemplar_bebas.remove(eksemplar)
+                pelanggan.buku_dipinjam[id_transaksi] = buku
+            else:
+                del self.transaksi_aktif[id_transaksi]
+
+        for buku in self.koleksi_buku:
+            if buku.tersedia:
+                self.buku_tersedia[buku.isbn] = buku
+
+    def _indeks_teks(self):
+        """Indeks teks, dibangun dari seluruh koleksi saat pertama dibutuhkan.
+
+        Pembangunan berjalan di luar kunci_data, agar thread lain (misalnya GUI) tidak
+        menunggu selama indeks dibangun; buku yang ditambahkan sementara itu disusulkan
+        sebelum indeks dipasang. Pemanggil tidak memegang kunci_data."""
+        with self.kunci_data:
+            if self.indeks_teks is not None:
+                return self.indeks_teks
+            # koleksi_buku hanya pernah ditambah: buku setelah panjang salinan ini adalah buku baru
+            koleksi = list(self.koleksi_buku)
+
+        indeks = IndeksTeks(self._teks_buku)
+        for buku in koleksi:
+            indeks.tambah(buku)
+
+        with self.kunci_data:
+            # Thread lain mungkin sudah lebih dulu memasang indeksnya
+            if self.indeks_teks is None:
+                for buku in self.koleksi_buku[len(koleksi):]:
+                    indeks.tambah(buku)
+                self.indeks_teks = indeks
+            return self.indeks_teks
+
+    def _teks_buku(self, isbn):
+        buku = self.indeks_buku[isbn]
+        return buku.judul, buku.penulis
+
+    def _laporan(self):
+        """Laporan, dibangun dari riwayat transaksi saat pertama dibutuhkan.
+
+        Seperti _indeks_teks, pembangunan berjalan di luar kunci_data. Transaksi baru dan
+        pengembalian yang terjadi sementara itu disusulkan sebelum laporan dipasang.
+        Pemanggil tidak memegang kunci_data."""
+        with self.kunci_data:
+            if self.laporan is not None:
+                return self.laporan
+            riwayat = list(self.transaksi)
+            # Status dibaca di bawah kunci; pinjaman yang masih aktif bisa dikembalikan selama pembangunan
+            aktif = list(self.transaksi_aktif.values())
+
+        laporan = LaporanPerpustakaan()
+        id_aktif = {transaksi.id_transaksi for transaksi in aktif}
+        for transaksi in riwayat:
+            laporan.catat_pinjam(transaksi)
+            if transaksi.id_transaksi not in id_aktif:
+                laporan.catat_kembali(transaksi)
+
+        with self.kunci_data:
+            if self.laporan is None:
+                for transaksi in aktif:
+                    if transaksi.status != "Dipinjam":
+                        laporan.catat_kembali(transaksi)
+                for transaksi in self.transaksi[len(riwayat):]:
+                    laporan.catat_pinjam(transaksi)
+                    if transaksi.status != "Dipinjam":
+                        laporan.catat_kembali(transaksi)
+                self.laporan = laporan
+            return self.laporan
+
+    def _kunci_buku(self, isbn):
+        return self.kunci_buku[hash(isbn) % self.JUMLAH_KUNCI]
+
+    def _kunci_pelanggan(self, id_pelanggan):
+        return self.kunci_pelanggan[hash(id_pelanggan) % self.JUMLAH_KUNCI]
+
+    def _tulis(self, fungsi, *argumen):
+        """Menulis ke penyimpanan (jika ada) di luar kunci_data, mengembalikan nomor penulisan"""
+        if self.commit_grup:
+            return self.commit_grup.tulis(fungsi, *argumen)
+        return 0
+
+    def _commit(self, nomor=None):
+        """Menunggu penulisan `nomor` permanen (semua penulisan jika None), lewat group commit"""
+        if self.commit_grup:
+            if nomor is None:
+                self.commit_grup.commit()
+            else:
+                self.commit_grup.tunggu(nomor)
+
+    def tambah_buku(self, buku):
+        # Kunci buku dipegang sampai buku tertulis, agar peminjamannya tidak tercatat lebih dulu
+        with self._kunci_buku(buku.isbn):
+            with self.kunci_data:
+                self.koleksi_buku.append(buku)
+                self.indeks_buku[buku.isbn] = buku
+                if self.indeks_teks is not None:
+                    self.indeks_teks.tambah(buku)
+                if buku.tersedia:
+                    self.buku_tersedia[buku.isbn] = buku
+            if self.penyimpanan:
+                self._tulis(self.penyimpanan.simpan_buku, buku)
+        return True
+
+    def tambah_eksemplar(self, isbn, jumlah):
+        buku = self.cari_buku_berdasarkan_isbn(isbn)
+        if not buku or jumlah <= 0:
+            return False
+        with self._kunci_buku(isbn):
+            buku.tambah_eksemplar(jumlah)
+            with self.kunci_data:
+                self.buku_tersedia[isbn] = buku
+            if self.penyimpanan:
+                self._tulis(self.penyimpanan.perbarui_jumlah_eksemplar, isbn, buku.jumlah_eksemplar)
+        return True
+
+    def cari_buku_berdasarkan_isbn(self, isbn):
+        return self.indeks_buku.get(isbn)
+
+    def cari_buku(self, kueri, batas=50):
+        """Pencarian teks pada judul dan penulis, hasil terurut berdasarkan relevansi"""
+        indeks = self._indeks_teks()
+        with self.kunci_data:
+            return [self.indeks_buku[isbn] for isbn in indeks.cari(kueri, batas)]
+
+    def ringkasan_laporan(self, k=10):
+        """Ringkasan laporan. Pemanggilan pertama membangun laporan dari riwayat transaksi;
+        setelahnya biayanya sebanding ukuran laporan, bukan jumlah riwayat transaksi"""
+        laporan = self._laporan()
+        with self.kunci_data:
+            return {
+                "pinjaman_aktif": laporan.jumlah_aktif,
+                "terlambat": laporan.jumlah_terlambat(),
+                "rata_rata_lama_pinjam": laporan.rata_rata_lama_pinjam(),
+                "pinjam_harian": laporan.pinjam_harian(),
+                "pinjam_bulanan": laporan.pinjam_bulanan(),
+                "buku_teratas": [(self.indeks_buku[isbn], jumlah)
+                                 for isbn, jumlah in laporan.buku_teratas.teratas()[:k]],
+                "peminjam_teratas": [(self.indeks_pelanggan[id_pelanggan], jumlah)
+                                     for id_pelanggan, jumlah in laporan.peminjam_teratas.teratas()[:k]],
+            }
+
+    def daftar_buku_tersedia(self):
+        with self.kunci_data:
+            return list(self.buku_tersedia.values())
+
+    def tambah_pelanggan(self, pelanggan):
+        with self._kunci_pelanggan(pelanggan.id_pelanggan):
+            with self.kunci_data:
+                self.daftar_pelanggan.append(pelanggan)
+                self.indeks_pelanggan[pelanggan.id_pelanggan] = pelanggan
+            if self.penyimpanan:
+                self._tulis(self.penyimpanan.simpan_pelanggan, pelanggan)
+        return True
+
+    def cari_pelanggan(self, id_pelanggan):
+        return self.indeks_pelanggan.get(id_pelanggan)
+
+    def pinjam_buku(self, id_pelanggan, isbn):
+        pelanggan = self.cari_pelanggan(id_pelanggan)
+        buku = self.cari_buku_berdasarkan_isbn(isbn)
+        
+        if not pelanggan:
+            return False, "Pelanggan tidak ditemukan"
+        
+        if not buku:
+            return False, "Buku tidak ditemukan"
+        
+        # Cek ketersediaan dan peminjaman dilakukan atomik di bawah kunci buku
+        with self._kunci_buku(isbn):
+            if not buku.tersedia:
+                return False, "Buku tidak tersedia"
+            
+            with self.kunci_data:
+                transaksi_baru = self._pinjam_terkunci(pelanggan, buku)
+            # Ditulis selagi kunci buku dipegang, agar tercatat sebelum pengembaliannya
+            nomor = self._tulis_transaksi_baru([transaksi_baru])
+            
+            with self._kunci_pelanggan(id_pelanggan):
+                pelanggan.buku_dipinjam[transaksi_baru.id_transaksi] = buku
+        
+        # Peminjaman baru dilaporkan berhasil setelah permanen; commit digabung dengan meja lain
+        self._commit(nomor)
+        return True, transaksi_baru.id_transaksi
+
+    def pinjam_buku_batch(self, id_pelanggan, daftar_isbn):
+        """Meminjamkan beberapa buku sekaligus ke satu pelanggan secara all-or-nothing.
+        Mengembalikan (True, daftar_id_transaksi) atau (False, pesan_kesalahan)."""
+        pelanggan = self.cari_pelanggan(id_pelanggan)
+        if not pelanggan:
+            return False, "Pelanggan tidak ditemukan"
+        
+        if not daftar_isbn:
+            return False, "Daftar ISBN kosong"
+        
+        # ISBN yang sama boleh muncul beberapa kali (beberapa eksemplar)
+        kebutuhan = Counter(daftar_isbn)
+        for isbn in kebutuhan:
+            if isbn not in self.indeks_buku:
+                return False, f"Buku {isbn} tidak ditemukan"
+        
+        with self._kunci_banyak_buku(kebutuhan):
+            # Semua buku divalidasi dulu; jika satu gagal, tidak ada yang dipinjamkan
+            for isbn, jumlah in kebutuhan.items():
+                if self.indeks_buku[isbn].jumlah_tersedia < jumlah:
+                    return False, f"Buku {isbn} tidak tersedia"
+            
+            with self.kunci_data:
+                daftar_transaksi = [self._pinjam_terkunci(pelanggan, self.indeks_buku[isbn]) for isbn in daftar_isbn]
+            nomor = self._tulis_transaksi_baru(daftar_transaksi)
+            
+            with self._kunci_pelanggan(id_pelanggan):
+                for transaksi in daftar_transaksi:
+                    pelanggan.buku_dipinjam[transaksi.id_transaksi] = transaksi.buku
+        
+        # Seluruh batch menjadi permanen dalam commit yang sama
+        self._commit(nomor)
+        return True, [transaksi.id_transaksi for transaksi in daftar_transaksi]
+
+    def _kunci_banyak_buku(self, daftar_isbn):
+        # Kunci selalu diambil berurutan nomor stripe agar dua batch tidak saling deadlock
+        nomor = sorted({hash(isbn) % self.JUMLAH_KUNCI for isbn in daftar_isbn})
+        tumpukan = ExitStack()
+        for n in nomor:
+            tumpukan.enter_context(self.kunci_buku[n])
+        return tumpukan
+
+    def _pinjam_terkunci(self, pelanggan, buku):
+        """Meminjamkan satu eksemplar di memori; pemanggil memegang kunci buku dan kunci_data"""
+        eksemplar = buku.ambil_eksemplar()
+        if not buku.tersedia:
+            self.buku_tersedia.pop(buku.isbn, None)
+        
+        # Proses peminjaman
+        transaksi = Transaksi(self._buat_id_transaksi(), pelanggan, buku, date.today(), eksemplar)
+        self._indeks_transaksi_baru(transaksi)
+        if self.laporan is not None:
+            self.laporan.catat_pinjam(transaksi)
+        return transaksi
+
+    def _kembalikan_terkunci(self, transaksi):
+        """Mengembalikan satu eksemplar di memori; pemanggil memegang kunci buku dan kunci_data"""
+        transaksi.status = "Dikembalikan"
+        transaksi.ordinal_dikembalikan = date.today().toordinal()
+        buku = transaksi.buku
+        buku.kembalikan_eksemplar(transaksi.eksemplar)
+        
+        self.buku_tersedia[buku.isbn] = buku
+        self.transaksi_aktif.pop(transaksi.id_transaksi, None)
+        if self.laporan is not None:
+            self.laporan.catat_kembali(transaksi)
+
+    def _tulis_transaksi_baru(self, daftar_transaksi):
+        # Satu pemanggilan _tulis per batch: commit mana pun mencakup seluruh batch atau tidak sama sekali
+        if self.penyimpanan:
+            return self._tulis(self.penyimpanan.simpan_banyak_transaksi, daftar_transaksi)
+        return 0
+
+    def _tulis_pengembalian(self, daftar_transaksi):
+        if self.penyimpanan:
+            return self._tulis(self.penyimpanan.perbarui_banyak_status, daftar_transaksi)
+        return 0
+
+    def _indeks_transaksi_baru(self, transaksi):
+        self.transaksi.append(transaksi)
+        self.indeks_transaksi[transaksi.id_transaksi] = transaksi
+        self.transaksi_per_pelanggan.setdefault(transaksi.pelanggan.id_pelanggan, []).append(transaksi)
+        self.transaksi_aktif[transaksi.id_transaksi] = transaksi
+
+    def halaman_transaksi(self, status=None, id_pelanggan=None, dari=None, sampai=None, offset=0, batas=100):
+        """Satu halaman transaksi terbaru lebih dulu, difilter status/pelanggan/rentang tanggal pinjam.
+
+        Sumber data dipilih dari indeks yang paling sempit (per pelanggan, transaksi aktif,
+        atau seluruh riwayat), dan rentang tanggal dicari dengan bisect karena setiap daftar
+        terurut kronologis. Mengembalikan (daftar_transaksi, ada_halaman_berikutnya).
+        """
+        ordinal_dari = dari.toordinal() if dari else None
+        ordinal_sampai = sampai.toordinal() if sampai else None
+
+        with self.kunci_data:
+            if id_pelanggan is not None:
+                sumber = self.transaksi_per_pelanggan.get(id_pelanggan, [])
+            elif status == "Dipinjam":
+                sumber = None
+            else:
+                sumber = self.transaksi
+
+            if sumber is None:
+                # Transaksi aktif: dict terurut kronologis, dibaca mundur tanpa disalin
+                kandidat = reversed(self.transaksi_aktif.values())
+            else:
+                awal, akhir = 0, len(sumber)
+                kunci = lambda t: t.ordinal_pinjam
+                if ordinal_dari is not None:
+                    awal = bisect.bisect_left(sumber, ordinal_dari, key=kunci)
+                if ordinal_sampai is not None:
+                    akhir = bisect.bisect_right(sumber, ordinal_sampai, key=kunci)
+                kandidat = (sumber[i] for i in range(akhir - 1, awal - 1, -1))
+
+            hasil = []
+            for transaksi in kandidat:
+                if ordinal_sampai is not None and transaksi.ordinal_pinjam > ordinal_sampai:
+                    continue
+                if ordinal_dari is not None and transaksi.ordinal_pinjam < ordinal_dari:
+                    break
+                if status is not None and transaksi.status != status:
+                    continue
+                if offset:
+                    offset -= 1
+                    continue
+                hasil.append(transaksi)
+                # Ambil satu lebih untuk mengetahui apakah masih ada halaman berikutnya
+                if len(hasil) > batas:
+                    break
+
+        return hasil[:batas], len(hasil) > batas
+
+    def _buat_id_transaksi(self):
+        # Buat ID transaksi sederhana, diulang jika kebetulan bentrok dengan ID yang sudah ada
+        id_transaksi = str(uuid.uuid4())[:8]
+        while id_transaksi in self.indeks_transaksi:
+            id_transaksi = str(uuid.uuid4())[:8]
+        return id_transaksi
+
+    def kembalikan_buku(self, id_transaksi):
+        transaksi = self.indeks_transaksi.get(id_transaksi)
+        if not transaksi:
+            return False
+        
+        with self._kunci_buku(transaksi.buku.isbn):
+            # Status dicek ulang di bawah kunci agar satu transaksi tidak dikembalikan dua kali
+            if transaksi.status != "Dipinjam":
+                return False
+            
+            with self.kunci_data:
+                self._kembalikan_terkunci(transaksi)
+            nomor = self._tulis_pengembalian([transaksi])
+            
+            # Hapus buku dari daftar buku yang dipinjam oleh pelanggan
+            with self._kunci_pelanggan(transaksi.pelanggan.id_pelanggan):
+                transaksi.pelanggan.buku_dipinjam.pop(id_transaksi, None)
+            
+        self._commit(nomor)
+        return True
+
+    def kembalikan_buku_batch(self, daftar_id_transaksi):
+        """Mengembalikan beberapa transaksi sekaligus secara all-or-nothing.
+        Mengembalikan (True, jumlah_dikembalikan) atau (False, pesan_kesalahan)."""
+        if not daftar_id_transaksi:
+            return False, "Daftar ID transaksi kosong"
+        if len(set(daftar_id_transaksi)) != len(daftar_id_transaksi):
+            return False, "Ada ID transaksi yang ganda"
+        
+        daftar_transaksi = []
+        for id_transaksi in daftar_id_transaksi:
+            transaksi = self.indeks_transaksi.get(id_transaksi)
+            if not transaksi:
+                return False, f"Transaksi {id_transaksi} tidak ditemukan"
+            daftar_transaksi.append(transaksi)
+        
+        with self._kunci_banyak_buku(t.buku.isbn for t in daftar_transaksi):
+            for transaksi in daftar_transaksi:
+                if transaksi.status != "Dipinjam":
+                    return False, f"Transaksi {transaksi.id_transaksi} sudah dikembalikan"
+            
+            with self.kunci_data:
+                for transaksi in daftar_transaksi:
+                    self._kembalikan_terkunci(transaksi)
+            nomor = self._tulis_pengembalian(daftar_transaksi)
+            
+            for transaksi in daftar_transaksi:
+                with self._kunci_pelanggan(transaksi.pelanggan.id_pelanggan):
+                    transaksi.pelanggan.buku_dipinjam.pop(transaksi.id_transaksi, None)
+        
+        self._commit(nomor)
+        return True, len(daftar_transaksi)
+
+    def tambah_banyak_buku(self, daftar_buku):
+        # Batch ditulis lebih dulu: jika penulisan gagal, memori belum berubah
+        if self.penyimpanan:
+            nomor = self._tulis(self.penyimpanan.simpan_banyak_buku, daftar_buku)
+        with self.kunci_data:
+            self.koleksi_buku.extend(daftar_buku)
+            for buku in daftar_buku:
+                self.indeks_buku[buku.isbn] = buku
+                if self.indeks_teks is not None:
+                    self.indeks_teks.tambah(buku)
+                if buku.tersedia:
+                    self.buku_tersedia[buku.isbn] = buku
+        if self.penyimpanan:
+            self._commit(nomor)
+
+    def tambah_banyak_pelanggan(self, daftar_pelanggan):
+        # Batch ditulis lebih dulu: jika penulisan gagal, memori belum berubah
+        if self.penyimpanan:
+            nomor = self._tulis(self.penyimpanan.simpan_banyak_pelanggan, daftar_pelanggan)
+        with self.kunci_data:
+            self.daftar_pelanggan.extend(daftar_pelanggan)
+            for pelanggan in daftar_pelanggan:
+                self.indeks_pelanggan[pelanggan.id_pelanggan] = pelanggan
+        if self.penyimpanan:
+            self._commit(nomor)
+
+    def _validasi_buku(self, records, ditolak):
+        for record in records:
+            try:
+                isbn = _teks_wajib(record["isbn"]).strip()
+                judul, penulis = _teks_wajib(record["judul"]), _teks_wajib(record["penulis"])
+                tahun_terbit = int(record["tahun_terbit"])
+                # Kolom kosong berarti satu eksemplar; 0 atau negatif ditolak di bawah
+                jumlah_eksemplar = record.get("jumlah_eksemplar")
+                jumlah_eksemplar = 1 if jumlah_eksemplar in (None, "") else int(jumlah_eksemplar)
+            except (KeyError, TypeError, ValueError):
+                ditolak[0] += 1
+                continue
+            # Eksemplar < 1 atau ISBN yang sudah ada di indeks (termasuk dari batch sebelumnya) ditolak
+            if jumlah_eksemplar < 1 or isbn in self.indeks_buku:
+                ditolak[0] += 1
+                continue
+            yield Buku(judul, penulis, isbn, tahun_terbit, jumlah_eksemplar)
+
+    def _validasi_pelanggan(self, records, ditolak):
+        for record in records:
+            try:
+                id_pelanggan = _teks_wajib(record["id_pelanggan"]).strip()
+                pelanggan = Pelanggan(id_pelanggan, _teks_wajib(record["nama"]), _teks_wajib(record["alamat"]),
+                                      _teks_wajib(record["no_telepon"]))
+            except (KeyError, TypeError, ValueError):
+                ditolak[0] += 1
+                continue
+            if id_pelanggan in self.indeks_pelanggan:
+                ditolak[0] += 1
+                continue
+            yield pelanggan
+
+    def _impor(self, path, validasi, tambah_banyak, ukuran_batch, progres):
+        status = {"byte": 0}
+        ukuran_berkas = os.path.getsize(path)
+        ditolak = [0]
+        berhasil = 0
+
+        # Record mengalir lewat generator: baca -> validasi -> batch, memori dibatasi ukuran batch
+        for batch in per_batch(validasi(baca_berkas(path, status), ditolak), ukuran_batch):
+            # Duplikat di dalam batch yang sama belum masuk indeks, jadi disaring di sini
+            unik = {}
+            for item in batch:
+                kunci = item.isbn if isinstance(item, Buku) else item.id_pelanggan
+                if kunci in unik:
+                    ditolak[0] += 1
+                else:
+                    unik[kunci] = item
+            tambah_banyak(list(unik.values()))
+            berhasil += len(unik)
+            if progres:
+                progres(status["byte"], ukuran_berkas)
+
+        return berhasil, ditolak[0]
+
+    def impor_buku(self, path, ukuran_batch=5000, progres=None):
+        """Impor buku dari CSV/JSON-lines/array JSON (kolom: judul, penulis, isbn, tahun_terbit, jumlah_eksemplar opsional).
+        Mengembalikan (jumlah_berhasil, jumlah_ditolak)."""
+        return self._impor(path, self._validasi_buku, self.tambah_banyak_buku, ukuran_batch, progres)
+
+    def impor_pelanggan(self, path, ukuran_batch=5000, progres=None):
+        """Impor pelanggan dari CSV/JSON-lines/array JSON (kolom: id_pelanggan, nama, alamat, no_telepon).
+        Mengembalikan (jumlah_berhasil, jumlah_ditolak)."""
+        return self._impor(path, self._validasi_pelanggan, self.tambah_banyak_pelanggan, ukuran_batch, progres)
+
+    def ekspor_buku(self, path):
+        """Ekspor buku ke CSV/JSON-lines dengan kolom yang sama seperti impor_buku"""
+        return tulis_berkas(path, ("judul", "penulis", "isbn", "tahun_terbit", "jumlah_eksemplar"),
+                            ((b.judul, b.penulis, b.isbn, b.tahun_terbit, b.jumlah_eksemplar)
+                             for b in list(self.koleksi_buku)))
+
+    def ekspor_pelanggan(self, path):
+        """Ekspor pelanggan ke CSV/JSON-lines dengan kolom yang sama seperti impor_pelanggan"""
+        return tulis_berkas(path, ("id_pelanggan", "nama", "alamat", "no_telepon"),
+                            ((p.id_pelanggan, p.nama, p.alamat, p.no_telepon)
+                             for p in list(self.daftar_pelanggan)))
+
+    def ekspor_transaksi(self, path):
+        """Ekspor riwayat transaksi ke CSV/JSON-lines"""
+        def baris():
+            for t in list(self.transaksi):
+                tanggal_dikembalikan = t.tanggal_dikembalikan
+                yield (t.id_transaksi, t.pelanggan.id_pelanggan, t.buku.isbn, t.eksemplar,
+                       t.tanggal_pinjam.isoformat(), t.tanggal_kembali.isoformat(), t.status,
+                       tanggal_dikembalikan.isoformat() if tanggal_dikembalikan else "")
+        return tulis_berkas(path, ("id_transaksi", "id_pelanggan", "isbn", "eksemplar", "tanggal_pinjam",
+                                   "tanggal_kembali", "status", "tanggal_dikembalikan"), baris())
+
+    def simpan(self):
+        self._commit()
+
+    def tutup(self):
+        if self.penyimpanan:
+            with self.commit_grup.kunci_tulis:
+                self.penyimpanan.tutup()
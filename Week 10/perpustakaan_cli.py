@@ -0,0 +1,152 @@
+"""Antarmuka baris perintah untuk Perpustakaan, tanpa GUI dan tanpa tkinter.
+
+Cocok untuk pekerjaan batch (cron) yang berjalan tanpa display.
+
+Penggunaan:
+    python perpustakaan_cli.py [--db PATH | --jurnal PATH] impor buku|pelanggan BERKAS
+    python perpustakaan_cli.py [--db PATH | --jurnal PATH] ekspor buku|pelanggan|transaksi BERKAS
+    python perpustakaan_cli.py [--db PATH | --jurnal PATH] pinjam ID_PELANGGAN ISBN [ISBN ...]
+    python perpustakaan_cli.py [--db PATH | --jurnal PATH] kembalikan ID_TRANSAKSI [ID_TRANSAKSI ...]
+
+BERKAS berformat CSV, JSON-lines jika berakhiran .jsonl/.ndjson, atau array JSON jika berakhiran .json.
+
+Satu pinjam/kembalikan pada database SQLite dijalankan langsung dengan query, tanpa
+memuat seluruh katalog ke memori, sehingga selesai dalam hitungan milidetik.
+
+Jangan jalankan CLI pada database atau jurnal yang sedang dibuka GUI. GUI menyimpan
+eksemplar bebas di memorinya sendiri dan tidak membaca ulang penyimpanan, sehingga
+pinjaman dari CLI tidak terlihat olehnya dan eksemplar yang sama bisa dipinjamkan dua kali.
+"""
+import argparse
+import sys
+from datetime import date, timedelta
+
+from perpustakaan import Perpustakaan, Transaksi
+
+
+def buka_penyimpanan(args):
+    # Modul penyimpanan hanya dimuat sesuai pilihan pengguna
+    if args.jurnal:
+        from jurnal import JurnalPerpustakaan
+        return JurnalPerpustakaan(args.jurnal)
+    from penyimpanan import PenyimpananSQLite
+    return PenyimpananSQLite(args.db)
+
+
+def perintah_impor(perpustakaan, args):
+    impor = perpustakaan.impor_buku if args.jenis == "buku" else perpustakaan.impor_pelanggan
+    berhasil, ditolak = impor(args.berkas, ukuran_batch=args.ukuran_batch)
+    print(f"{berhasil} {args.jenis} diimpor, {ditolak} baris ditolak")
+    return 0
+
+
+def perintah_ekspor(perpustakaan, args):
+    ekspor = {
+        "buku": perpustakaan.ekspor_buku,
+        "pelanggan": perpustakaan.ekspor_pelanggan,
+        "transaksi": perpustakaan.ekspor_transaksi,
+    }[args.jenis]
+    jumlah = ekspor(args.berkas)
+    print(f"{jumlah} {args.jenis} diekspor ke {args.berkas}")
+    return 0
+
+
+def perintah_pinjam(perpustakaan, args):
+    if len(args.isbn) > 1:
+        sukses, hasil = perpustakaan.pinjam_buku_batch(args.id_pelanggan, args.isbn)
+    else:
+        sukses, hasil = perpustakaan.pinjam_buku(args.id_pelanggan, args.isbn[0])
+        if sukses:
+            hasil = [hasil]
+    if not sukses:
+        print(f"Gagal: {hasil}", file=sys.stderr)
+        return 1
+    # Satu ID transaksi per baris agar mudah diproses skrip lain
+    for id_transaksi in hasil:
+        print(id_transaksi)
+    return 0
+
+
+def pinjam_langsung(penyimpanan, args):
+    hari_ini = date.today()
+    sukses, hasil = penyimpanan.pinjam_langsung(args.id_pelanggan, args.isbn[0], hari_ini,
+                                                hari_ini + timedelta(days=Transaksi.LAMA_PINJAM))
+    if not sukses:
+        print(f"Gagal: {hasil}", file=sys.stderr)
+        return 1
+    print(hasil)
+    return 0
+
+
+def kembalikan_langsung(penyimpanan, args):
+    if not penyimpanan.kembalikan_langsung(args.id_transaksi[0], date.today()):
+        print("Gagal: Transaksi tidak ditemukan atau sudah dikembalikan", file=sys.stderr)
+        return 1
+    print("1 buku dikembalikan")
+    return 0
+
+
+def perintah_kembalikan(perpustakaan, args):
+    if len(args.id_transaksi) > 1:
+        sukses, pesan = perpustakaan.kembalikan_buku_batch(args.id_transaksi)
+    else:
+        sukses = perpustakaan.kembalikan_buku(args.id_transaksi[0])
+        pesan = "Transaksi tidak ditemukan atau sudah dikembalikan"
+    if not sukses:
+        print(f"Gagal: {pesan}", file=sys.stderr)
+        return 1
+    print(f"{len(args.id_transaksi)} buku dikembalikan")
+    return 0
+
+
+def buat_parser():
+    parser = argparse.ArgumentParser(description="Sistem Manajemen Perpustakaan (baris perintah)")
+    sumber = parser.add_mutually_exclusive_group()
+    sumber.add_argument("--db", default="perpustakaan.db", help="berkas database SQLite (bawaan: %(default)s)")
+    sumber.add_argument("--jurnal", help="gunakan penyimpanan jurnal append-only di PATH")
+    sub = parser.add_subparsers(dest="perintah", required=True)
+
+    impor = sub.add_parser("impor", help="impor buku/pelanggan dari CSV, JSON-lines atau array JSON")
+    impor.add_argument("jenis", choices=("buku", "pelanggan"))
+    impor.add_argument("berkas")
+    impor.add_argument("--ukuran-batch", type=int, default=5000)
+    impor.set_defaults(fungsi=perintah_impor)
+
+    ekspor = sub.add_parser("ekspor", help="ekspor data ke CSV, JSON-lines atau array JSON")
+    ekspor.add_argument("jenis", choices=("buku", "pelanggan", "transaksi"))
+    ekspor.add_argument("berkas")
+    ekspor.set_defaults(fungsi=perintah_ekspor)
+
+    pinjam = sub.add_parser("pinjam", help="pinjamkan satu atau beberapa buku ke pelanggan")
+    pinjam.add_argument("id_pelanggan")
+    pinjam.add_argument("isbn", nargs="+")
+    pinjam.set_defaults(fungsi=perintah_pinjam, langsung=pinjam_langsung)
+
+    kembalikan = sub.add_parser("kembalikan", help="kembalikan satu atau beberapa transaksi")
+    kembalikan.add_argument("id_transaksi", nargs="+")
+    kembalikan.set_defaults(fungsi=perintah_kembalikan, langsung=kembalikan_langsung)
+    return parser
+
+
+def main(argv=None):
+    args = buat_parser().parse_args(argv)
+    penyimpanan = buka_penyimpanan(args)
+
+    # Operasi satu baris langsung ke penyimpanan jika didukung (SQLite); jurnal harus di-replay
+    argumen = getattr(args, "isbn", None) or getattr(args, "id_transaksi", None) or ()
+    langsung = getattr(args, "langsung", None)
+    if langsung and len(argumen) == 1 and hasattr(penyimpanan, "pinjam_langsung"):
+        try:
+            return langsung(penyimpanan, args)
+        finally:
+            penyimpanan.tutup()
+
+    perpustakaan = Perpustakaan(penyimpanan)
+    try:
+        return args.fungsi(perpustakaan, args)
+    finally:
+        perpustakaan.tutup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""Uji beban multi-thread untuk Perpustakaan.
+
+Beberapa "meja layanan" (thread) meminjam dan mengembalikan buku secara acak pada
+satu objek Perpustakaan yang sama. Di akhir setiap putaran diperiksa bahwa tidak ada
+buku yang dipinjamkan dua kali dan status buku/pelanggan konsisten dengan transaksi.
+
+Uji dijalankan tanpa penyimpanan, dengan SQLite dan dengan jurnal. Dengan penyimpanan
+permanen setiap operasi menunggu commit; commit beberapa meja digabung (group commit),
+sehingga kolom Op/commit naik seiring jumlah meja. Uji gagal jika percepatan throughput
+pada jumlah meja terbanyak di bawah batas minimal penyimpanan tersebut.
+
+Penggunaan:
+    python uji_beban.py [--operasi N] [--penyimpanan tanpa sqlite jurnal] [--minimal-percepatan X]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from perpustakaan import Buku, Pelanggan, Perpustakaan
+
+# Percepatan minimal (meja terbanyak terhadap 1 meja) per penyimpanan. Jurnal menunggu
+# fsync di luar GIL sehingga harus naik. SQLite (WAL, synchronous=FULL) memang fsync setiap
+# commit, tetapi commit-nya menahan kunci_tulis sehingga meja lain tidak bisa menulis selama
+# fsync; percepatannya tidak diharapkan naik, begitu pula tanpa penyimpanan.
+MINIMAL_PERCEPATAN = {"jurnal": 1.3}
+
+
+def buka_penyimpanan(jenis, folder):
+    if jenis == "sqlite":
+        from penyimpanan import PenyimpananSQLite
+        return PenyimpananSQLite(os.path.join(folder, "uji_beban.db"))
+    if jenis == "jurnal":
+        from jurnal import JurnalPerpustakaan
+        return JurnalPerpustakaan(os.path.join(folder, "uji_beban.jurnal"))
+    return None
+
+
+def buat_perpustakaan(jumlah_buku, jumlah_pelanggan, penyimpanan=None):
+    perpustakaan = Perpustakaan(penyimpanan)
+    perpustakaan.tambah_banyak_buku([
+        Buku(f"Buku {i}", f"Penulis {i % 100}", str(i), 2000, 1 + i % 3) for i in range(jumlah_buku)])
+    perpustakaan.tambah_banyak_pelanggan([
+        Pelanggan(f"P{i}", f"Pelanggan {i}", "Alamat", "0800") for i in range(jumlah_pelanggan)])
+    return perpustakaan
+
+
+def meja_layanan(perpustakaan, jumlah_operasi, jumlah_buku, jumlah_pelanggan, seed, hasil):
+    rng = random.Random(seed)
+    pinjaman = []
+    berhasil = 0
+    for _ in range(jumlah_operasi):
+        if pinjaman and rng.random() < 0.5:
+            id_transaksi = pinjaman.pop(rng.randrange(len(pinjaman)))
+            if perpustakaan.kembalikan_buku(id_transaksi):
+                berhasil += 1
+        else:
+            id_pelanggan = f"P{rng.randrange(jumlah_pelanggan)}"
+            isbn = str(rng.randrange(jumlah_buku))
+            sukses, pesan = perpustakaan.pinjam_buku(id_pelanggan, isbn)
+            if sukses:
+                pinjaman.append(pesan)
+                berhasil += 1
+    hasil.append(berhasil)
+
+
+def periksa_konsistensi(perpustakaan):
+    """Mengembalikan daftar pelanggaran; daftar kosong berarti tidak ada peminjaman ganda"""
+    pelanggaran = []
+    aktif_per_isbn = {}
+    for transaksi in perpustakaan.transaksi:
+        if transaksi.status == "Dipinjam":
+            aktif_per_isbn[transaksi.buku.isbn] = aktif_per_isbn.get(transaksi.buku.isbn, 0) + 1
+
+    eksemplar_aktif = set()
+    for transaksi in perpustakaan.transaksi:
+        if transaksi.status == "Dipinjam":
+            kunci = (transaksi.buku.isbn, transaksi.eksemplar)
+            if kunci in eksemplar_aktif:
+                pelanggaran.append(f"Eksemplar {kunci[1]} buku {kunci[0]} dipinjam dua kali sekaligus")
+            eksemplar_aktif.add(kunci)
+
+    tersedia = {buku.isbn for buku in perpustakaan.daftar_buku_tersedia()}
+    for buku in perpustakaan.koleksi_buku:
+        aktif = aktif_per_isbn.get(buku.isbn, 0)
+        if aktif > buku.jumlah_eksemplar:
+            pelanggaran.append(f"Buku {buku.isbn} dipinjam {aktif} kali dari {buku.jumlah_eksemplar} eksemplar")
+        if buku.jumlah_tersedia != buku.jumlah_eksemplar - aktif:
+            pelanggaran.append(f"Jumlah eksemplar bebas buku {buku.isbn} tidak sesuai transaksi")
+        if (buku.isbn in tersedia) != buku.tersedia:
+            pelanggaran.append(f"Buku {buku.isbn} tidak sesuai daftar buku tersedia")
+
+    jumlah_dipinjam = sum(len(p.buku_dipinjam) for p in perpustakaan.daftar_pelanggan)
+    if jumlah_dipinjam != sum(aktif_per_isbn.values()):
+        pelanggaran.append("Jumlah buku dipinjam pelanggan tidak sesuai transaksi aktif")
+    return pelanggaran
+
+
+def jalankan(jumlah_operasi=20000, jumlah_buku=500, jumlah_pelanggan=200, daftar_meja=(1, 2, 4, 8),
+             jenis_penyimpanan="tanpa", minimal_percepatan=None):
+    # Perpindahan thread dibuat sangat sering agar race condition lebih mudah muncul
+    sys.setswitchinterval(1e-5)
+    print(f"Penyimpanan: {jenis_penyimpanan}")
+    print(f"{'Meja':>4} | {'Operasi':>8} | {'Waktu (s)':>9} | {'Ops/detik':>10} | {'Percepatan':>10} | "
+          f"{'Op/commit':>9} | Konsisten")
+    throughput_awal = None
+    for jumlah_meja in daftar_meja:
+        with tempfile.TemporaryDirectory() as folder:
+            perpustakaan = buat_perpustakaan(jumlah_buku, jumlah_pelanggan, buka_penyimpanan(jenis_penyimpanan, folder))
+            try:
+                hasil = []
+                threads = [
+                    threading.Thread(target=meja_layanan,
+                                     args=(perpustakaan, jumlah_operasi, jumlah_buku, jumlah_pelanggan, seed, hasil))
+                    for seed in range(jumlah_meja)
+                ]
+
+                mulai = time.perf_counter()
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                waktu = time.perf_counter() - mulai
+
+                pelanggaran = periksa_konsistensi(perpustakaan)
+                commit_grup = perpustakaan.commit_grup
+                op_per_commit = f"{commit_grup.nomor_tulis / max(1, commit_grup.jumlah_commit):.1f}" \
+                    if commit_grup else "-"
+            finally:
+                perpustakaan.tutup()
+
+        total_operasi = jumlah_operasi * jumlah_meja
+        throughput = total_operasi / waktu
+        throughput_awal = throughput_awal or throughput
+        print(f"{jumlah_meja:>4} | {total_operasi:>8} | {waktu:>9.3f} | {throughput:>10.0f} | "
+              f"{throughput / throughput_awal:>9.2f}x | {op_per_commit:>9} | {'Ya' if not pelanggaran else 'TIDAK'}")
+        for pesan in pelanggaran[:10]:
+            print("   ", pesan)
+        if pelanggaran:
+            return False
+
+    percepatan = throughput / throughput_awal
+    if minimal_percepatan is not None and percepatan < minimal_percepatan:
+        print(f"Throughput {jumlah_meja} meja hanya {percepatan:.2f}x dari 1 meja "
+              f"(minimal {minimal_percepatan:.2f}x)")
+        return False
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uji beban multi-thread Perpustakaan")
+    parser.add_argument("--operasi", type=int, default=None,
+                        help="operasi per meja (bawaan: 20000 tanpa penyimpanan, 2000 dengan penyimpanan)")
+    parser.add_argument("--meja", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--penyimpanan", nargs="+", choices=("tanpa", "sqlite", "jurnal"),
+                        default=["tanpa", "sqlite", "jurnal"])
+    parser.add_argument("--minimal-percepatan", type=float,
+                        help="percepatan minimal jumlah meja terbanyak terhadap 1 meja untuk semua "
+                             "penyimpanan permanen (bawaan: %s)" % MINIMAL_PERCEPATAN)
+    args = parser.parse_args(argv)
+
+    sukses = True
+    for jenis in args.penyimpanan:
+        operasi = args.operasi or (20000 if jenis == "tanpa" else 2000)
+        minimal = MINIMAL_PERCEPATAN.get(jenis)
+        if args.minimal_percepatan is not None and jenis != "tanpa":
+            minimal = args.minimal_percepatan
+        sukses = jalankan(operasi, daftar_meja=args.meja, jenis_penyimpanan=jenis,
+                          minimal_percepatan=minimal) and sukses
+        print()
+    return 0 if sukses else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import argparse
+import csv
+import json
+import time
+import numpy as np
+
+class SearchBenchmark:
+    """Pengukuran waktu metode pencarian ProductSearchApp dengan warm-up dan pengulangan.
+
+    Setiap metode dijalankan beberapa kali untuk setiap kata kunci, lalu diringkas menjadi
+    median, p95, rata-rata dan selang kepercayaan 95% untuk median (bootstrap).
+    """
+
+    KINDS = ('hit', 'miss', 'prefix')
+
+    def __init__(self, app, methods=('linear_search', 'binary_search'), warmup=3, repeats=20, seed=0):
+        self.app = app
+        self.methods = methods
+        self.warmup = warmup
+        self.repeats = repeats
+        self.rng = np.random.default_rng(seed)
+
+    def make_keywords(self, mix):
+        """Membuat daftar (jenis, kata_kunci) dari katalog saat ini.
+        mix: jumlah kata kunci per jenis, misalnya {'hit': 5, 'miss': 5, 'prefix': 5}"""
+        products = self.app.products
+        keywords = []
+        for kind in self.KINDS:
+            for _ in range(mix.get(kind, 0)):
+                name = products.name(int(self.rng.integers(len(products))))
+                if kind == 'hit':
+                    keyword = name
+                elif kind == 'prefix':
+                    keyword = name[:int(self.rng.integers(3, len(name)))]
+                else:
+                    keyword = f"Tidak-Ada-{int(self.rng.integers(10 ** 9))}"
+                keywords.append((kind, keyword))
+        return keywords
+
+    def time_call(self, method, keyword):
+        """Waktu (nanodetik) setiap pengulangan satu pencarian, setelah warm-up"""
+        search = getattr(self.app, method)
+        for _ in range(self.warmup):
+            search(keyword)
+        samples = []
+        for _ in range(self.repeats):
+            start = time.perf_counter_ns()
+            search(keyword)
+            samples.append(time.perf_counter_ns() - start)
+        return samples
+
+    def summarize(self, samples, resamples=1000):
+        """Ringkasan statistik sampel waktu (nanodetik)"""
+        samples = np.asarray(samples, dtype=np.float64)
+        # Selang kepercayaan median dengan bootstrap persentil
+        boot = np.median(self.rng.choice(samples, size=(resamples, len(samples))), axis=1)
+        return {
+            'runs': len(samples),
+            'median_ns': float(np.median(samples)),
+            'p95_ns': float(np.percentile(samples, 95)),
+            'mean_ns': float(samples.mean()),
+            'ci95_low_ns': float(np.percentile(boot, 2.5)),
+            'ci95_high_ns': float(np.percentile(boot, 97.5)),
+        }
+
+    def run(self, sizes, mix=None, keywords=None):
+        """Menjalankan benchmark untuk setiap ukuran dataset.
+        Kata kunci tetap dapat diberikan lewat keywords, selain itu dibuat dari mix."""
+        mix = mix or {'hit': 5, 'miss': 5, 'prefix': 5}
+        # Dataset terbesar dibuat sekali; ukuran lain memakai n produk pertamanya
+        full_products = self.app.generate_products(max(sizes))
+        records = []
+
+        for size in sorted(sizes):
+            self.app.load_products(full_products.head(size))
+            size_keywords = [('given', k) for k in keywords] if keywords else self.make_keywords(mix)
+
+            for method in self.methods:
+                samples_by_kind = {}
+                for kind, keyword in size_keywords:
+                    samples_by_kind.setdefault(kind, []).extend(self.time_call(method, keyword))
+                if len(samples_by_kind) > 1:
+                    samples_by_kind['all'] = [s for samples in samples_by_kind.values() for s in samples]
+
+                for kind, samples in samples_by_kind.items():
+                    record = {'method': method, 'size': size, 'kind': kind}
+                    record.update(self.summarize(samples))
+                    records.append(record)
+
+        return records
+
+    @staticmethod
+    def comparison_results(records, kind=None):
+        """Median per ukuran dalam format ProductSearchApp.plot_comparison:
+        [{'size': n, 'linear_time': detik, ...}]"""
+        if kind is None:
+            kinds = {record['kind'] for record in records}
+            kind = 'all' if 'all' in kinds else kinds.pop()
+        results = {}
+        for record in records:
+            if record['kind'] == kind:
+                row = results.setdefault(record['size'], {'size': record['size']})
+                row[record['method'].replace('_search', '') + '_time'] = record['median_ns'] / 1e9
+        return [results[size] for size in sorted(results)]
+
+    @staticmethod
+    def to_json(records, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2)
+
+    @staticmethod
+    def to_csv(records, path):
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(records[0]))
+            writer.writeheader()
+            writer.writerows(records)
+
+def parse_mix(text):
+    """Mengubah "hit=5,miss=5,prefix=5" menjadi dict"""
+    mix = {}
+    for part in text.split(','):
+        kind, count = part.split('=')
+        mix[kind.strip()] = int(count)
+    return mix
+
+def main():
+    from PencarianProduk import ProductSearchApp
+
+    parser = argparse.ArgumentParser(description="Benchmark metode pencarian produk")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000])
+    parser.add_argument('--methods', nargs='+', default=['linear_search', 'binary_search', 'trigram_search'])
+    parser.add_argument('--mix', type=parse_mix, default={'hit': 5, 'miss': 5, 'prefix': 5},
+                        help="jumlah kata kunci per jenis, misalnya hit=5,miss=5,prefix=5")
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="simpan hasil ke berkas JSON")
+    parser.add_argument('--csv', help="simpan hasil ke berkas CSV")
+    parser.add_argument('--plot', action='store_true', help="buat grafik log-log search_comparison.png")
+    args = parser.parse_args()
+
+    app = ProductSearchApp(seed=args.seed)
+    benchmark = SearchBenchmark(app, args.methods, args.warmup, args.repeats, args.seed)
+    records = benchmark.run(args.sizes, args.mix)
+
+    for record in records:
+        print(f"{record['method']:<15} {record['size']:>8} {record['kind']:<6} "
+              f"median {record['median_ns'] / 1000:>10.1f} us  p95 {record['p95_ns'] / 1000:>10.1f} us  "
+              f"CI95 [{record['ci95_low_ns'] / 1000:.1f}, {record['ci95_high_ns'] / 1000:.1f}] us")
+
+    if args.json:
+        SearchBenchmark.to_json(records, args.json)
+    if args.csv:
+        SearchBenchmark.to_csv(records, args.csv)
+    if args.plot:
+        app.plot_comparison(SearchBenchmark.comparison_results(records))
+
+# Menjalankan benchmark
+if __name__ == "__main__":
+    main()
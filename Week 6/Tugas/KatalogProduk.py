@@ -0,0 +1,312 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import numpy as np
+
+# Format berkas katalog (little-endian):
+#   header   : magic "PRDKAT01", versi (u32), flag (u32, bit 0 = semua nama ASCII),
+#              jumlah produk (u64), jumlah section (u32)
+#   tabel    : per section nama (24 byte), offset (u64), panjang byte (u64)
+#   section  : isi mentah array/teks, setiap section dimulai di kelipatan 64 byte
+#              agar bisa langsung dibaca sebagai array NumPy lewat np.frombuffer
+MAGIC = b"PRDKAT01"
+VERSION = 1
+FLAG_ASCII = 1
+HEADER = struct.Struct("<8sIIQI")
+SECTION = struct.Struct("<24sQQ")
+ALIGNMENT = 64
+
+# Nama section -> dtype little-endian eksplisit; None berarti teks/byte mentah
+SECTIONS = {
+    'ids': '<i8',
+    'prices': '<i8',
+    'stocks': '<i4',
+    'category_codes': 'u1',
+    'name_offsets': '<i8',
+    'name_heap': None,
+    'categories': None,
+    'sorted_order': '<i8',
+    'price_order': '<i8',
+    'sorted_prices': '<i8',
+    'stock_order': '<i8',
+    'sorted_stocks': '<i4',
+    'category_positions': '<i4',
+    'category_offsets': '<i8',
+    'trigram_keys': None,
+    'trigram_key_offsets': '<i8',
+    'trigram_postings': '<i4',
+    'trigram_offsets': '<i8',
+}
+
+class ProductStore:
+    """Katalog produk berbentuk kolom: satu array NumPy per atribut, bukan satu dict per produk.
+    
+    Nama produk disimpan berurutan dalam satu buffer byte dengan array offset,
+    sehingga nama ke-i adalah buffer[offsets[i]:offsets[i + 1]].
+    """
+    
+    CATEGORIES = ['Elektronik', 'Pakaian', 'Makanan', 'Minuman', 'Perabotan', 'Kosmetik', 'Olahraga']
+    
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._prices = np.empty(capacity, dtype=np.int64)
+        self._stocks = np.empty(capacity, dtype=np.int32)
+        # Kategori disimpan sebagai kode kecil (indeks ke self.categories)
+        self._category_codes = np.empty(capacity, dtype=np.uint8)
+        self._name_offsets = np.zeros(capacity + 1, dtype=np.int64)
+        self.name_buffer = bytearray()
+        # True jika semua nama ASCII (panjang byte = panjang karakter)
+        self.ascii_names = True
+        self.categories = list(self.CATEGORIES)
+        self.category_lookup = {category: code for code, category in enumerate(self.categories)}
+    
+    @classmethod
+    def from_arrays(cls, ids, name_buffer, name_offsets, category_codes, prices, stocks, ascii_names=None):
+        """Membuat katalog dari array yang sudah jadi tanpa menyalin apa pun.
+        name_buffer boleh berupa buffer read-only (misalnya memoryview dari mmap);
+        salinannya baru dibuat saat produk pertama ditambahkan."""
+        store = cls(capacity=0)
+        store._ids = ids
+        store._prices = prices
+        store._stocks = stocks
+        store._category_codes = category_codes
+        store._name_offsets = name_offsets
+        store.name_buffer = name_buffer
+        store.ascii_names = name_buffer.isascii() if ascii_names is None else ascii_names
+        store.size = len(ids)
+        return store
+    
+    def head(self, n):
+        """Katalog berisi n produk pertama; kolom angka berbagi memori dengan katalog ini"""
+        n = min(n, self.size)
+        store = ProductStore.from_arrays(
+            self._ids[:n], self.name_buffer[:self._name_offsets[n]], self._name_offsets[:n + 1],
+            self._category_codes[:n], self._prices[:n], self._stocks[:n], self.ascii_names
+        )
+        store.categories = list(self.categories)
+        store.category_lookup = dict(self.category_lookup)
+        return store
+    
+    def __len__(self):
+        return self.size
+    
+    @property
+    def ids(self):
+        return self._ids[:self.size]
+    
+    @property
+    def prices(self):
+        return self._prices[:self.size]
+    
+    @property
+    def stocks(self):
+        return self._stocks[:self.size]
+    
+    @property
+    def category_codes(self):
+        return self._category_codes[:self.size]
+    
+    @property
+    def name_offsets(self):
+        return self._name_offsets[:self.size + 1]
+    
+    def category_code(self, category):
+        code = self.category_lookup.get(category)
+        if code is None:
+            code = self.category_lookup[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+    
+    def _grow(self):
+        # Kapasitas digandakan agar penambahan satu per satu tetap amortized O(1)
+        capacity = max(1, 2 * len(self._ids))
+        for attr in ('_ids', '_prices', '_stocks', '_category_codes'):
+            old = getattr(self, attr)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, attr, new)
+        offsets = np.zeros(capacity + 1, dtype=np.int64)
+        offsets[:self.size + 1] = self._name_offsets[:self.size + 1]
+        self._name_offsets = offsets
+    
+    def append(self, product):
+        """Menambah satu produk (dict) dan mengembalikan posisinya"""
+        if self.size == len(self._ids):
+            self._grow()
+        i = self.size
+        self._ids[i] = product['id']
+        self._prices[i] = product['price']
+        self._stocks[i] = product['stock']
+        self._category_codes[i] = self.category_code(product['category'])
+        if not isinstance(self.name_buffer, bytearray):
+            self.name_buffer = bytearray(self.name_buffer)
+        self.name_buffer += product['name'].encode('utf-8')
+        self.ascii_names = self.ascii_names and product['name'].isascii()
+        self._name_offsets[i + 1] = len(self.name_buffer)
+        self.size += 1
+        return i
+    
+    def name(self, i):
+        return str(self.name_buffer[self._name_offsets[i]:self._name_offsets[i + 1]], 'utf-8')
+    
+    def lower_name(self, i):
+        return self.name(i).lower()
+    
+    def names(self, chunk_size=4096):
+        """Semua nama produk sesuai urutan katalog.
+        Dibaca per blok, sehingga pemanggil yang berhenti lebih awal tidak membayar seluruh katalog."""
+        for chunk_start in range(0, self.size, chunk_size):
+            offsets = self._name_offsets[chunk_start:min(chunk_start + chunk_size, self.size) + 1].tolist()
+            base = offsets[0]
+            buffer = bytes(self.name_buffer[base:offsets[-1]])
+            for start, end in zip(offsets, offsets[1:]):
+                yield buffer[start - base:end - base].decode('utf-8')
+    
+    def row(self, i):
+        """Tampilan satu produk sebagai dict, dibuat hanya saat dibutuhkan"""
+        return {
+            'id': int(self._ids[i]),
+            'name': self.name(i),
+            'category': self.categories[self._category_codes[i]],
+            'price': int(self._prices[i]),
+            'stock': int(self._stocks[i])
+        }
+
+def _csr(postings):
+    """Menggabungkan beberapa posting list menjadi (isi, offset) seperti matriks CSR"""
+    lengths = np.fromiter((len(p) for p in postings), dtype=np.int64, count=len(postings))
+    offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    values = np.concatenate([np.frombuffer(p, dtype=np.int32) for p in postings]) if postings else np.empty(0, np.int32)
+    return values.astype(np.int32), offsets
+
+def write_catalog(path, app):
+    """Menulis katalog dan indeks ProductSearchApp ke satu berkas biner"""
+    products = app.products
+    categories = len(products.categories)
+    category_postings = [app.category_index.get(code, b'') for code in range(categories)]
+    category_positions, category_offsets = _csr(category_postings)
+
+    trigram_keys = sorted(app.trigram_index)
+    encoded_keys = [key.encode('utf-8') for key in trigram_keys]
+    key_offsets = np.zeros(len(encoded_keys) + 1, dtype=np.int64)
+    np.cumsum([len(key) for key in encoded_keys], out=key_offsets[1:])
+    trigram_postings, trigram_offsets = _csr([app.trigram_index[key] for key in trigram_keys])
+
+    contents = {
+        'ids': products.ids,
+        'prices': products.prices,
+        'stocks': products.stocks,
+        'category_codes': products.category_codes,
+        'name_offsets': products.name_offsets,
+        'name_heap': bytes(products.name_buffer[:int(products.name_offsets[-1])]),
+        'categories': json.dumps(products.categories).encode('utf-8'),
+        'sorted_order': app.sorted_order,
+        'price_order': app.price_order,
+        'sorted_prices': app.sorted_prices,
+        'stock_order': app.stock_order,
+        'sorted_stocks': app.sorted_stocks,
+        'category_positions': category_positions,
+        'category_offsets': category_offsets,
+        'trigram_keys': b''.join(encoded_keys),
+        'trigram_key_offsets': key_offsets,
+        'trigram_postings': trigram_postings,
+        'trigram_offsets': trigram_offsets,
+    }
+
+    # Byte tiap section dalam dtype yang tercatat di SECTIONS
+    data = []
+    for name, dtype in SECTIONS.items():
+        value = contents[name]
+        data.append(value if dtype is None else np.ascontiguousarray(value, dtype=dtype).tobytes())
+
+    # Tabel section dihitung dulu karena offset bergantung pada ukuran header
+    position = HEADER.size + SECTION.size * len(SECTIONS)
+    table = []
+    for name, raw in zip(SECTIONS, data):
+        position += -position % ALIGNMENT
+        table.append((name, position, len(raw)))
+        position += len(raw)
+
+    # Ditulis ke berkas sementara lalu diganti sekaligus, sehingga berkas lama (yang mungkin
+    # sedang di-mmap) tidak pernah terlihat setengah tertulis
+    flags = FLAG_ASCII if products.ascii_names else 0
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, len(products), len(SECTIONS)))
+        for name, offset, length in table:
+            f.write(SECTION.pack(name.encode('ascii'), offset, length))
+        for (name, offset, length), raw in zip(table, data):
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_path, path)
+
+class MappedCatalog:
+    """Berkas katalog yang dibuka dengan mmap.
+
+    Semua kolom dan indeks adalah view ke halaman berkas (tanpa salinan), sehingga
+    pembukaan hampir instan dan beberapa proses pencarian berbagi page cache yang sama.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, flags, size, count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} bukan berkas katalog produk versi {VERSION}")
+        self.sections = {}
+        for k in range(count):
+            name, offset, length = SECTION.unpack_from(self.mm, HEADER.size + k * SECTION.size)
+            self.sections[name.rstrip(b'\0').decode('ascii')] = (offset, length)
+        self.view = memoryview(self.mm)
+
+        self.products = ProductStore.from_arrays(
+            self.array('ids'), self.raw('name_heap'), self.array('name_offsets'),
+            self.array('category_codes'), self.array('prices'), self.array('stocks'),
+            ascii_names=bool(flags & FLAG_ASCII)
+        )
+        self.products.categories = json.loads(bytes(self.raw('categories')))
+        self.products.category_lookup = {category: code for code, category in enumerate(self.products.categories)}
+        if len(self.products) != size:
+            raise ValueError(f"{path} rusak: header mencatat {size} produk, isi berkas {len(self.products)}")
+
+        self.sorted_order = self.array('sorted_order')
+        self.price_order = self.array('price_order')
+        self.sorted_prices = self.array('sorted_prices')
+        self.stock_order = self.array('stock_order')
+        self.sorted_stocks = self.array('sorted_stocks')
+        self.category_index = self._postings(self.raw('category_positions'), self.array('category_offsets'))
+        self.trigram_index = self._trigram_index()
+
+    def raw(self, name):
+        offset, length = self.sections[name]
+        return self.view[offset:offset + length]
+
+    def array(self, name):
+        offset, length = self.sections[name]
+        dtype = np.dtype(SECTIONS[name])
+        return np.frombuffer(self.mm, dtype=dtype, count=length // dtype.itemsize, offset=offset)
+
+    @staticmethod
+    def _postings(values, offsets):
+        """Posting list sebagai memoryview int32 ke dalam berkas, bukan salinan"""
+        if sys.byteorder != 'little':
+            # memoryview.cast memakai urutan byte mesin, jadi isinya dikonversi dulu
+            values = memoryview(np.frombuffer(values, dtype='<i4').astype(np.int32).tobytes())
+        values = values.cast('i')
+        offsets = offsets.tolist()
+        return {key: values[start:end] for key, (start, end) in enumerate(zip(offsets, offsets[1:]))}
+
+    def _trigram_index(self):
+        keys = bytes(self.raw('trigram_keys'))
+        key_offsets = self.array('trigram_key_offsets').tolist()
+        postings = self._postings(self.raw('trigram_postings'), self.array('trigram_offsets'))
+        return {keys[start:end].decode('utf-8'): postings[k]
+                for k, (start, end) in enumerate(zip(key_offsets, key_offsets[1:]))}
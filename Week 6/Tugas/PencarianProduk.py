@@ -1,150 +1,645 @@
+import os
 import time
-import random
+import bisect
+import re
+import heapq
+import itertools
+from array import array
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from prettytable import PrettyTable
+from BenchmarkPencarian import SearchBenchmark
+from KatalogProduk import MappedCatalog, ProductStore, write_catalog
+
+class QueryCache:
+    """Cache LRU untuk hasil pencarian, dikosongkan otomatis saat versi katalog berubah"""
+    
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key, version):
+        if version != self.version:
+            # Katalog sudah berubah sejak hasil disimpan, semua entri tidak berlaku lagi
+            self.entries.clear()
+            self.version = version
+        results = self.entries.get(key)
+        if results is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return results
+    
+    def put(self, key, version, results):
+        if version != self.version:
+            return
+        self.entries[key] = results
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            # Entri paling lama tidak dipakai dibuang
+            self.entries.popitem(last=False)
 
 class ProductSearchApp:
-    def __init__(self):
+    # Batas total posting trigram jarang yang dihitung fuzzy_candidates
+    FUZZY_POSTING_LIMIT = 20000
+    
+    def __init__(self, seed=None, catalog_path=None):
+        # Seed yang sama menghasilkan katalog yang sama, agar pengujian bisa diulang
+        self.seed = seed
+        # Versi katalog dinaikkan setiap ada perubahan produk, dipakai untuk invalidasi cache
+        self.catalog_version = 0
+        self.query_cache = QueryCache()
+        self.catalog_file = None
+        # Katalog yang sudah tersimpan dibuka dengan mmap beserta indeksnya, tanpa generate ulang
+        if catalog_path and os.path.exists(catalog_path):
+            self.open_catalog(catalog_path)
+            return
         # Inisialisasi database produk
-        self.products = self.generate_products(10000)  # Generate 10,000 produk
+        self.load_products(self.generate_products(10000))  # Generate 10,000 produk
+        if catalog_path:
+            self.save_catalog(catalog_path)
+        
+    def load_products(self, products):
+        """Memakai katalog baru dan membangun ulang semua indeks"""
+        self.products = products
+        self.catalog_version += 1
         # Urutkan produk berdasarkan nama untuk binary search
-        self.sorted_products = sorted(self.products, key=lambda x: x['name'])
+        self.build_sorted_index()
+        # Indeks trigram untuk pencarian substring
+        self.build_trigram_index()
+        # Indeks kategori, harga dan stok untuk filter_query
+        self.build_secondary_indexes()
+        
+    def save_catalog(self, path):
+        """Menyimpan katalog beserta indeksnya ke berkas biner (lihat KatalogProduk.py)"""
+        write_catalog(path, self)
+    
+    def open_catalog(self, path):
+        """Membuka berkas katalog dengan mmap; halaman berkas baru dibaca saat disentuh query"""
+        self.catalog_file = MappedCatalog(path)
+        self.products = self.catalog_file.products
+        self.catalog_version += 1
+        self.sorted_order = self.catalog_file.sorted_order
+        self.trigram_index = self.catalog_file.trigram_index
+        self.category_index = self.catalog_file.category_index
+        self.price_order = self.catalog_file.price_order
+        self.sorted_prices = self.catalog_file.sorted_prices
+        self.stock_order = self.catalog_file.stock_order
+        self.sorted_stocks = self.catalog_file.sorted_stocks
+    
+    def generate_products(self, n, seed=None):
+        """Membuat database produk secara acak dengan operasi vektor NumPy"""
+        rng = np.random.default_rng(self.seed if seed is None else seed)
+        
+        ids = np.arange(1, n + 1, dtype=np.int64)
+        category_codes = rng.integers(0, len(ProductStore.CATEGORIES), n, dtype=np.uint8)
+        prices = rng.integers(10000, 1000000, n, endpoint=True, dtype=np.int64)
+        stocks = rng.integers(0, 100, n, endpoint=True, dtype=np.int32)
+        
+        # Nama "Produk-<id>" ditulis langsung ke buffer byte, satu operasi vektor per posisi karakter
+        prefix = np.frombuffer(b"Produk-", dtype=np.uint8)
+        digits = np.ones(n, dtype=np.int64)
+        for power in range(1, len(str(n))):
+            digits += ids >= 10 ** power
+        lengths = len(prefix) + digits
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        starts = offsets[:-1]
+        
+        buffer = np.empty(offsets[-1], dtype=np.uint8)
+        for k, char in enumerate(prefix):
+            buffer[starts + k] = char
+        # Digit ke-j dari kanan untuk semua id yang punya minimal j+1 digit
+        remaining = ids.copy()
+        for j in range(len(str(n))):
+            has_digit = digits > j
+            buffer[(starts + lengths - 1 - j)[has_digit]] = ord('0') + remaining[has_digit] % 10
+            remaining //= 10
+        
+        return ProductStore.from_arrays(ids, buffer.tobytes(), offsets, category_codes, prices, stocks)
+    
+    @staticmethod
+    def trigrams(text):
+        """Semua potongan 3 karakter (trigram) dari teks"""
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+    
+    def build_trigram_index(self):
+        """Membangun indeks trigram -> posisi produk dari nama yang sudah di-lowercase"""
+        self.trigram_index = {}
+        for position, name in enumerate(self.products.names()):
+            self._index_product(position, name)
+    
+    def _index_product(self, position, name):
+        # Posisi selalu bertambah, jadi setiap posting list tetap terurut.
+        # array('i') menyimpan posisi sebagai int 4 byte, bukan objek int Python.
+        for trigram in self.trigrams(name.lower()):
+            posting = self.trigram_index.get(trigram)
+            if not isinstance(posting, array):
+                # Posting dari berkas katalog bersifat read-only, disalin saat pertama diubah
+                posting = self.trigram_index[trigram] = array('i', posting or ())
+            posting.append(position)
+    
+    def add_product(self, product):
+        """Menambah produk baru dan memperbarui semua indeks"""
+        position = self.products.append(product)
+        self.catalog_version += 1
+        index = bisect.bisect_right(self.sorted_order, product['name'].lower(), key=self.products.lower_name)
+        self.sorted_order = np.insert(self.sorted_order, index, position)
+        self._index_product(position, product['name'])
+        self._index_attributes(position)
+    
+    def build_secondary_indexes(self):
+        """Membangun indeks hash kategori -> posisi dan array harga/stok terurut"""
+        self.category_index = {}
+        codes = self.products.category_codes
+        for code in np.unique(codes).tolist():
+            self.category_index[code] = array('i', np.flatnonzero(codes == code).astype(np.int32).tobytes())
+        
+        # Urutan posisi berdasarkan nilai, beserta nilai terurutnya untuk searchsorted
+        self.price_order = np.argsort(self.products.prices, kind='stable')
+        self.sorted_prices = self.products.prices[self.price_order]
+        self.stock_order = np.argsort(self.products.stocks, kind='stable')
+        self.sorted_stocks = self.products.stocks[self.stock_order]
+    
+    def _index_attributes(self, position):
+        code = int(self.products.category_codes[position])
+        posting = self.category_index.get(code)
+        if not isinstance(posting, array):
+            posting = self.category_index[code] = array('i', posting or ())
+        posting.append(position)
+        
+        price = self.products.prices[position]
+        index = np.searchsorted(self.sorted_prices, price, side='right')
+        self.price_order = np.insert(self.price_order, index, position)
+        self.sorted_prices = np.insert(self.sorted_prices, index, price)
+        
+        stock = self.products.stocks[position]
+        index = np.searchsorted(self.sorted_stocks, stock, side='right')
+        self.stock_order = np.insert(self.stock_order, index, position)
+        self.sorted_stocks = np.insert(self.sorted_stocks, index, stock)
+    
+    @staticmethod
+    def _range_positions(order, sorted_values, low, high):
+        """Posisi produk dengan low <= nilai <= high dari indeks terurut (batas None berarti terbuka)"""
+        lo = 0 if low is None else np.searchsorted(sorted_values, low, side='left')
+        hi = len(sorted_values) if high is None else np.searchsorted(sorted_values, high, side='right')
+        return order[lo:max(lo, hi)]
+    
+    def plan_filter(self, category=None, min_price=None, max_price=None, min_stock=None, max_stock=None):
+        """Memilih indeks paling selektif untuk kondisi filter.
+        Mengembalikan (nama_indeks, posisi_kandidat); kandidat masih harus dicek kondisi lainnya.
+        Posisi None berarti semua produk dipindai (plan 'scan')."""
+        plans = []
+        if category is not None:
+            code = self.products.category_lookup.get(category)
+            posting = self.category_index.get(code, array('i'))
+            plans.append(('kategori', np.frombuffer(posting, dtype=np.int32) if posting else np.empty(0, np.int32)))
+        if min_price is not None or max_price is not None:
+            plans.append(('harga', self._range_positions(self.price_order, self.sorted_prices, min_price, max_price)))
+        if min_stock is not None or max_stock is not None:
+            plans.append(('stok', self._range_positions(self.stock_order, self.sorted_stocks, min_stock, max_stock)))
+        
+        # Ukuran kandidat tiap indeks diketahui tanpa membaca isinya (panjang posting / selisih searchsorted)
+        best = min(plans, key=lambda plan: len(plan[1]), default=None)
+        # Indeks yang kurang selektif kalah cepat dibanding mask atas seluruh kolom
+        if best is None or len(best[1]) * 8 > len(self.products):
+            return 'scan', None
+        return best
+    
+    def trigram_search(self, keyword):
+        """Pencarian substring dengan indeks trigram, hasil sama dengan linear search"""
+        start_time = time.time()
+        results = list(self._iter_trigram(keyword))
+        execution_time = time.time() - start_time
+        
+        return results, execution_time
+    
+    def _iter_linear(self, keyword):
+        keyword = keyword.lower()
+        return (i for i, name in enumerate(self.products.names()) if keyword in name.lower())
+    
+    def _iter_trigram(self, keyword):
+        """Posisi produk yang namanya memuat keyword, berurutan sesuai katalog"""
+        keyword = keyword.lower()
+        
+        if len(keyword) < 3:
+            # Kata kunci terlalu pendek untuk trigram, scan semua nama
+            yield from self._iter_linear(keyword)
+            return
         
-    def generate_products(self, n):
-        """Membuat database produk secara acak"""
-        categories = ['Elektronik', 'Pakaian', 'Makanan', 'Minuman', 'Perabotan', 'Kosmetik', 'Olahraga']
-        products = []
+        postings = []
+        for trigram in self.trigrams(keyword):
+            posting = self.trigram_index.get(trigram)
+            if posting is None:
+                return
+            postings.append(posting)
         
-        for i in range(n):
-            product = {
-                'id': i + 1,
-                'name': f"Produk-{i + 1}",
-                'category': random.choice(categories),
-                'price': random.randint(10000, 1000000),
-                'stock': random.randint(0, 100)
-            }
-            products.append(product)
+        # Irisan dimulai dari posting list terpendek
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            # Jika kandidat sudah sedikit, lebih murah diverifikasi langsung
+            if len(candidates) * 8 < len(posting):
+                break
+            candidates.intersection_update(posting)
         
-        return products
+        # Kata kunci 3 huruf pasti cocok; yang lebih panjang perlu diverifikasi
+        # karena trigram-nya bisa muncul terpisah-pisah di dalam nama
+        for i in sorted(candidates):
+            if len(keyword) == 3 or keyword in self.products.lower_name(i):
+                yield i
     
     def linear_search(self, keyword):
-        """Implementasi linear search O(n)"""
+        """Implementasi linear search O(n), mengembalikan posisi produk yang cocok"""
         start_time = time.time()
         results = []
+        keyword = keyword.lower()
         
-        for product in self.products:
-            if keyword.lower() in product['name'].lower():
-                results.append(product)
+        for i, name in enumerate(self.products.names()):
+            if keyword in name.lower():
+                results.append(i)
                 
         end_time = time.time()
         execution_time = end_time - start_time
         
         return results, execution_time
     
+    @staticmethod
+    def natural_key(name):
+        """Kunci urutan alami: angka dibandingkan sebagai angka, jadi Produk-9 < Produk-10"""
+        return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name.lower())]
+    
+    def build_sorted_index(self):
+        """Mengurutkan posisi produk berdasarkan nama lowercase"""
+        lower_names = np.array([name.lower() for name in self.products.names()])
+        self.sorted_order = np.argsort(lower_names, kind='stable')
+    
+    def _prefix_range(self, keyword):
+        """Rentang [lo, hi) pada sorted_order berisi semua nama berawalan keyword (lowercase)"""
+        # Nama hanya dibaca dari katalog pada posisi yang diperiksa bisect
+        lo = bisect.bisect_left(self.sorted_order, keyword, key=self.products.lower_name)
+        hi = bisect.bisect_left(self.sorted_order, keyword + '\U0010ffff', lo, key=self.products.lower_name)
+        return lo, hi
+    
     def binary_search(self, keyword):
-        """Implementasi binary search O(log n)"""
+        """Pencarian prefix dengan binary search O(log n + k)"""
         start_time = time.time()
-        results = []
         
-        # Binary search hanya bekerja untuk pencarian yang persis sama
-        # Untuk mencari substring, kita gunakan binary search untuk menemukan posisi awal
-        # dan kemudian mencari substring di area sekitarnya
+        # Semua nama berawalan keyword berada dalam satu rentang pada urutan leksikografis
+        lo, hi = self._prefix_range(keyword.lower())
+        
+        # Rentang prefix hanya kontigu pada urutan leksikografis,
+        # jadi urutan alami diterapkan pada k hasil saja
+        results = sorted(self.sorted_order[lo:hi].tolist(), key=lambda i: self.natural_key(self.products.name(i)))
+        
+        end_time = time.time()
+        execution_time = end_time - start_time
+        
+        return results, execution_time
+    
+    def filter_query(self, category=None, min_price=None, max_price=None, min_stock=None, max_stock=None,
+                     sort_by='price', descending=False, limit=20):
+        """Filter multi-atribut dengan mask NumPy, contoh:
+        filter_query('Elektronik', 50000, 200000, min_stock=1, sort_by='price', limit=20)"""
+        start_time = time.time()
+        products = self.products
+        
+        # Kandidat diambil dari indeks paling selektif, diurutkan agar urutan katalog terjaga
+        self.last_plan, positions = self.plan_filter(category, min_price, max_price, min_stock, max_stock)
+        if positions is None:
+            column = lambda values: values
+            mask = np.ones(len(products), dtype=bool)
+        else:
+            positions = np.sort(positions)
+            column = lambda values: values[positions]
+            mask = np.ones(len(positions), dtype=bool)
+        
+        # Kondisi lainnya menjadi operasi vektor atas kolom (kandidat saja jika memakai indeks)
+        if category is not None and self.last_plan != 'kategori':
+            mask &= column(products.category_codes) == products.category_lookup.get(category, -1)
+        if self.last_plan != 'harga':
+            if min_price is not None:
+                mask &= column(products.prices) >= min_price
+            if max_price is not None:
+                mask &= column(products.prices) <= max_price
+        if self.last_plan != 'stok':
+            if min_stock is not None:
+                mask &= column(products.stocks) >= min_stock
+            if max_stock is not None:
+                mask &= column(products.stocks) <= max_stock
+        positions = np.flatnonzero(mask) if positions is None else positions[mask]
+        
+        if sort_by is not None:
+            values = {'id': products.ids, 'price': products.prices, 'stock': products.stocks}[sort_by][positions]
+            if descending:
+                values = -values
+            if limit is not None and limit < len(positions):
+                # argpartition mencari nilai ke-k dalam O(n), hanya k hasil yang kemudian diurutkan.
+                # Dari produk bernilai sama dengan batas, yang posisinya paling awal yang diambil.
+                kth = values[np.argpartition(values, limit - 1)[limit - 1]]
+                keep = values < kth
+                keep[np.flatnonzero(values == kth)[:limit - np.count_nonzero(keep)]] = True
+                positions, values = positions[keep], values[keep]
+            # Nilai sama diurutkan berdasarkan posisi agar hasil deterministik
+            positions = positions[np.lexsort((positions, values))]
+        if limit is not None:
+            positions = positions[:limit]
+        
+        execution_time = time.time() - start_time
+        
+        return positions.tolist(), execution_time
+    
+    @staticmethod
+    def bounded_levenshtein(a, b, max_distance):
+        """Jarak edit a dan b jika <= max_distance, selain itu None.
+        Hanya diagonal selebar 2 * max_distance + 1 yang dihitung, dan berhenti begitu
+        seluruh baris sudah melewati batas."""
+        if abs(len(a) - len(b)) > max_distance:
+            return None
+        too_far = max_distance + 1
+        previous = [j if j <= max_distance else too_far for j in range(len(b) + 1)]
+        for i in range(1, len(a) + 1):
+            lo, hi = max(1, i - max_distance), min(len(b), i + max_distance)
+            current = [too_far] * (len(b) + 1)
+            current[0] = i if i <= max_distance else too_far
+            for j in range(lo, hi + 1):
+                cost = 0 if a[i - 1] == b[j - 1] else 1
+                current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost, too_far)
+            if min(current[lo - 1:hi + 1]) > max_distance:
+                return None
+            previous = current
+        return previous[len(b)] if previous[len(b)] <= max_distance else None
+    
+    def fuzzy_candidates(self, keyword, max_distance):
+        """Posisi produk yang mungkin berjarak edit <= max_distance dari keyword,
+        atau None jika trigram keyword tidak cukup jarang untuk membatasi kandidat.
         
-        # Implementasi modified binary search untuk substring
-        left, right = 0, len(self.sorted_products) - 1
-        found_index = -1
+        Satu edit merusak paling banyak 3 trigram, jadi nama yang cocok memuat minimal
+        (jumlah trigram keyword - 3 * max_distance) trigram keyword. Hanya trigram jarang
+        (total posting <= FUZZY_POSTING_LIMIT) yang dihitung; trigram umum dianggap selalu ada,
+        sehingga syaratnya menjadi (jumlah trigram jarang - 3 * max_distance).
+        """
+        products = self.products
+        trigram_list = sorted(self.trigrams(keyword),
+                              key=lambda trigram: len(self.trigram_index.get(trigram, ())))
         
-        # Mencari produk dengan nama yang persis sama dengan keyword
-        while left <= right:
-            mid = (left + right) // 2
-            if self.sorted_products[mid]['name'].lower() == keyword.lower():
-                found_index = mid
+        rare, total = 0, 0
+        for trigram in trigram_list:
+            total += len(self.trigram_index.get(trigram, ()))
+            if total > self.FUZZY_POSTING_LIMIT:
                 break
-            elif self.sorted_products[mid]['name'].lower() < keyword.lower():
-                left = mid + 1
-            else:
-                right = mid - 1
+            rare += 1
+        required = rare - 3 * max_distance
+        if required <= 0:
+            # Setiap nama bisa lolos hitungan, kandidat tidak bisa dibatasi
+            return None
+        
+        postings = [np.frombuffer(self.trigram_index[t], dtype=np.int32)
+                    for t in trigram_list[:rare] if t in self.trigram_index]
+        if not postings:
+            return np.empty(0, dtype=np.int64)
+        candidates, counts = np.unique(np.concatenate(postings), return_counts=True)
+        candidates = candidates[counts >= required].astype(np.int64)
+        
+        # Filter panjang; panjang byte sama dengan panjang karakter hanya untuk nama ASCII
+        if products.ascii_names:
+            lengths = products.name_offsets[candidates + 1] - products.name_offsets[candidates]
+            candidates = candidates[np.abs(lengths - len(keyword)) <= max_distance]
+        return candidates
+    
+    def batch_levenshtein(self, keyword, candidates, max_distance):
+        """Jarak edit keyword (ASCII, lowercase) ke nama ASCII semua kandidat sekaligus.
+        Setiap sel diagonal DP dihitung sebagai satu operasi vektor atas semua kandidat,
+        dan kandidat yang seluruh barisnya sudah melewati batas langsung dibuang.
+        Jarak di atas max_distance dipotong menjadi max_distance + 1."""
+        products = self.products
+        too_far = max_distance + 1
+        distances = np.full(len(candidates), too_far, dtype=np.int64)
+        if not len(candidates):
+            return distances
+        
+        starts = products.name_offsets[candidates]
+        lengths = products.name_offsets[candidates + 1] - starts
+        width = int(lengths.max())
         
-        # Jika menemukan produk yang persis sama
-        if found_index != -1:
-            results.append(self.sorted_products[found_index])
+        buffer = np.frombuffer(products.name_buffer, dtype=np.uint8)
+        columns = np.arange(width)
+        names = buffer[np.minimum(starts[:, None] + columns, len(buffer) - 1)]
+        del buffer
+        names = np.where(columns < lengths[:, None], names, 0)
+        # Lowercase ASCII secara vektor
+        names = np.where((names >= ord('A')) & (names <= ord('Z')), names + 32, names)
+        
+        alive = np.arange(len(candidates))
+        previous = np.minimum(np.broadcast_to(np.arange(width + 1), (len(candidates), width + 1)), too_far)
+        for i, char in enumerate(keyword.encode('ascii'), start=1):
+            current = np.full_like(previous, too_far)
+            current[:, 0] = min(i, too_far)
+            # Hanya diagonal |i - j| <= max_distance yang bisa menghasilkan jarak <= max_distance
+            for j in range(max(1, i - max_distance), min(width, i + max_distance) + 1):
+                cost = names[:, j - 1] != char
+                current[:, j] = np.minimum(np.minimum(previous[:, j], current[:, j - 1]) + 1, previous[:, j - 1] + cost)
+            previous = np.minimum(current, too_far)
             
-            # Periksa produk serupa di sekitarnya (karena mungkin ada beberapa produk dengan nama yang sama)
-            i = found_index - 1
-            while i >= 0 and keyword.lower() in self.sorted_products[i]['name'].lower():
-                results.append(self.sorted_products[i])
-                i -= 1
-                
-            i = found_index + 1
-            while i < len(self.sorted_products) and keyword.lower() in self.sorted_products[i]['name'].lower():
-                results.append(self.sorted_products[i])
-                i += 1
+            keep = previous.min(axis=1) <= max_distance
+            if not keep.all():
+                alive, previous, names, lengths = alive[keep], previous[keep], names[keep], lengths[keep]
+                if not len(alive):
+                    return distances
+        
+        distances[alive] = previous[np.arange(len(alive)), lengths]
+        return distances
+    
+    def _fuzzy_walk(self, keyword, max_distance):
+        """(jarak, posisi) semua nama berjarak edit <= max_distance dari keyword (lowercase).
+        
+        sorted_order dijelajahi seperti trie: setiap prefix adalah satu rentang yang dicari
+        dengan bisect, dan membawa satu baris DP terhadap keyword. Prefix yang seluruh barisnya
+        sudah melewati max_distance tidak diperluas, jadi yang dikunjungi hanya prefix yang masih
+        dekat dengan awalan keyword, bukan semua produk.
+        """
+        order = self.sorted_order
+        key = self.products.lower_name
+        chars = sorted(set(keyword))
+        too_far = max_distance + 1
+        
+        def extend(row, char, depth):
+            """Baris DP untuk prefix + char, atau None jika seluruh baris melewati batas"""
+            new = [too_far] * len(row)
+            new[0] = min(depth, too_far)
+            # Seperti bounded_levenshtein, hanya diagonal |depth - j| <= max_distance yang dihitung
+            lo, hi = max(1, depth - max_distance), min(len(keyword), depth + max_distance)
+            for j in range(lo, hi + 1):
+                new[j] = min(new[j - 1] + 1, row[j] + 1, row[j - 1] + (keyword[j - 1] != char), too_far)
+            return new if min(new[lo - 1:hi + 1]) <= max_distance else None
+        
+        matches = []
+        first = [min(j, too_far) for j in range(len(keyword) + 1)]
+        stack = [(0, len(order), '', first)] if len(order) else []
+        while stack:
+            lo, hi, prefix, row = stack.pop()
+            depth = len(prefix) + 1
+            # Nama yang sama persis dengan prefix selalu berada di awal rentangnya
+            if key(order[lo]) == prefix:
+                end = bisect.bisect_right(order, prefix, lo, hi, key=key)
+                if row[-1] <= max_distance:
+                    matches.extend((row[-1], i) for i in order[lo:end].tolist())
+                lo = end
+            if lo == hi:
+                continue
+            
+            # Semua karakter di luar keyword menghasilkan baris yang sama
+            other = extend(row, '', depth)
+            if other is not None:
+                # Semua cabang masih mungkin cocok, jadi dijalani satu per satu
+                while lo < hi:
+                    char = key(order[lo])[len(prefix)]
+                    child = prefix + char
+                    end = bisect.bisect_left(order, child + '\U0010ffff', lo, hi, key=key)
+                    next_row = extend(row, char, depth) if char in keyword else other
+                    if next_row is not None:
+                        stack.append((lo, end, child, next_row))
+                    lo = end
+            else:
+                # Hanya cabang dengan karakter keyword yang bisa tetap dalam batas
+                for char in chars:
+                    next_row = extend(row, char, depth)
+                    if next_row is None:
+                        continue
+                    child = prefix + char
+                    start = bisect.bisect_left(order, child, lo, hi, key=key)
+                    if start == hi or not key(order[start]).startswith(child):
+                        continue
+                    lo = bisect.bisect_left(order, child + '\U0010ffff', start, hi, key=key)
+                    stack.append((start, lo, child, next_row))
+        return sorted(matches)
+    
+    def fuzzy_search(self, keyword, max_distance=1):
+        """Pencarian toleran salah ketik: nama dengan jarak edit <= max_distance,
+        diurutkan dari yang paling mirip"""
+        start_time = time.time()
+        keyword = keyword.lower()
+        
+        candidates = self.fuzzy_candidates(keyword, max_distance)
+        if candidates is None:
+            # Trigram tidak selektif (keyword pendek atau trigram umum), jadi kandidat
+            # dicari lewat urutan nama alih-alih memeriksa seluruh katalog
+            results = [i for _, i in self._fuzzy_walk(keyword, max_distance)]
+        elif keyword.isascii() and self.products.ascii_names:
+            # Semua kandidat diverifikasi sekaligus dengan operasi vektor
+            distances = self.batch_levenshtein(keyword, candidates, max_distance)
+            keep = distances <= max_distance
+            candidates, distances = candidates[keep], distances[keep]
+            results = candidates[np.lexsort((candidates, distances))].tolist()
         else:
-            # Jika tidak menemukan yang persis sama, lakukan pencarian linier dalam subset
-            # untuk demonstrasi, kita terbatas pada 1000 item pertama
-            subset = self.sorted_products[:1000]
-            for product in subset:
-                if keyword.lower() in product['name'].lower():
-                    results.append(product)
+            matches = []
+            for i in candidates.tolist():
+                distance = self.bounded_levenshtein(keyword, self.products.lower_name(i), max_distance)
+                if distance is not None:
+                    matches.append((distance, i))
+            results = [i for _, i in sorted(matches)]
         
-        end_time = time.time()
-        execution_time = end_time - start_time
+        execution_time = time.time() - start_time
+        
+        return results, execution_time
+    
+    def iter_search(self, keyword, mode='trigram', offset=0, limit=None):
+        """Generator posisi hasil pencarian untuk satu halaman (offset, limit).
+        Pemindaian berhenti begitu halaman terisi; mode: 'linear', 'binary' atau 'trigram'."""
+        stop = None if limit is None else offset + limit
+        if mode == 'binary':
+            lo, hi = self._prefix_range(keyword.lower())
+            matches = self.sorted_order[lo:hi].tolist()
+            natural = lambda i: self.natural_key(self.products.name(i))
+            # Urutan alami untuk halaman ini cukup dengan heap sebesar offset + limit
+            ordered = sorted(matches, key=natural) if stop is None else heapq.nsmallest(stop, matches, key=natural)
+            return iter(ordered[offset:])
+        matches = self._iter_linear(keyword) if mode == 'linear' else self._iter_trigram(keyword)
+        return itertools.islice(matches, offset, stop)
+    
+    def top_k_search(self, keyword, k=5, by='price', largest=False, mode='trigram'):
+        """k produk dengan nilai kolom terkecil (atau terbesar) di antara hasil pencarian,
+        memakai heap berukuran k sehingga seluruh hasil tidak pernah disimpan sekaligus"""
+        start_time = time.time()
+        values = {'id': self.products.ids, 'price': self.products.prices, 'stock': self.products.stocks}[by]
+        select = heapq.nlargest if largest else heapq.nsmallest
+        # Posisi ikut dalam kunci agar nilai yang sama tetap berurutan sesuai katalog
+        sign = -1 if largest else 1
+        results = select(k, self.iter_search(keyword, mode), key=lambda i: (int(values[i]), sign * i))
+        execution_time = time.time() - start_time
+        
+        return results, execution_time
+    
+    def cached_search(self, keyword, mode='linear'):
+        """Pencarian lewat cache LRU; mode: 'linear', 'binary' atau 'trigram'"""
+        start_time = time.time()
+        # Semua mode pencarian tidak membedakan huruf besar/kecil
+        key = (mode, keyword.lower())
+        results = self.query_cache.get(key, self.catalog_version)
+        if results is None:
+            search = {'linear': self.linear_search, 'binary': self.binary_search, 'trigram': self.trigram_search}[mode]
+            results, _ = search(keyword)
+            # Disimpan sebagai tuple agar hasil di cache tidak ikut berubah oleh pemanggil
+            results = tuple(results)
+            self.query_cache.put(key, self.catalog_version, results)
+        
+        execution_time = time.time() - start_time
         
         return results, execution_time
     
-    def run_comparison_test(self, keyword, dataset_sizes):
-        """Menjalankan tes perbandingan waktu eksekusi"""
+    def run_comparison_test(self, keyword, dataset_sizes, warmup=3, repeats=20):
+        """Menjalankan tes perbandingan waktu eksekusi (median dari beberapa pengulangan)"""
         table = PrettyTable()
-        table.field_names = ["Ukuran Dataset", "Linear Search (detik)", "Binary Search (detik)", "Perbandingan (Binary/Linear)"]
-        results = []
+        table.field_names = ["Ukuran Dataset", "Linear Search (detik)", "Binary Search (detik)",
+                             "Perbandingan (Binary/Linear)", "CI95 Linear (detik)", "CI95 Binary (detik)"]
         
-        for size in dataset_sizes:
-            # Batasi dataset untuk pengujian
-            self.products = self.generate_products(size)
-            self.sorted_products = sorted(self.products, key=lambda x: x['name'])
-            
-            # Jalankan linear search
-            _, linear_time = self.linear_search(keyword)
-            
-            # Jalankan binary search
-            _, binary_time = self.binary_search(keyword)
-            
-            # Hitung perbandingan (jika linear_time tidak nol)
-            if linear_time != 0:
-                comparison = binary_time / linear_time
-            else:
-                comparison = "N/A"
-                
-            # Tambahkan hasil ke tabel
-            table.add_row([size, f"{linear_time:.6f}", f"{binary_time:.6f}", f"{comparison:.6f}" if isinstance(comparison, float) else comparison])
-            
-            # Simpan hasil untuk grafik
-            results.append({
-                'size': size,
-                'linear_time': linear_time,
-                'binary_time': binary_time
-            })
+        benchmark = SearchBenchmark(self, ('linear_search', 'binary_search'), warmup, repeats, self.seed)
+        records = benchmark.run(dataset_sizes, keywords=[keyword])
+        stats = {(record['method'], record['size']): record for record in records}
+        results = SearchBenchmark.comparison_results(records)
+        
+        for result in results:
+            size = result['size']
+            linear, binary = stats['linear_search', size], stats['binary_search', size]
+            # Median perf_counter_ns selalu positif, jadi rasio selalu terdefinisi
+            table.add_row([
+                size,
+                f"{result['linear_time']:.6f}",
+                f"{result['binary_time']:.6f}",
+                f"{result['binary_time'] / result['linear_time']:.6f}",
+                f"{linear['ci95_low_ns'] / 1e9:.6f}-{linear['ci95_high_ns'] / 1e9:.6f}",
+                f"{binary['ci95_low_ns'] / 1e9:.6f}-{binary['ci95_high_ns'] / 1e9:.6f}"
+            ])
         
         return table, results
     
     def plot_comparison(self, results):
-        """Membuat grafik perbandingan waktu eksekusi"""
+        """Membuat grafik log-log waktu eksekusi beserta eksponen skala hasil fitting"""
         df = pd.DataFrame(results)
+        labels = {'linear_time': 'Linear Search', 'binary_time': 'Binary Search', 'trigram_time': 'Indeks Trigram'}
         
         plt.figure(figsize=(10, 6))
-        plt.plot(df['size'], df['linear_time'], 'ro-', label='Linear Search O(n)')
-        plt.plot(df['size'], df['binary_time'], 'bo-', label='Binary Search O(log n)')
+        for column in [c for c in df.columns if c.endswith('_time')]:
+            # Kemiringan garis pada skala log-log adalah eksponen k pada waktu ~ n^k
+            exponent = np.polyfit(np.log(df['size']), np.log(df[column]), 1)[0] if len(df) > 1 else float('nan')
+            label = labels.get(column, column[:-len('_time')])
+            plt.loglog(df['size'], df[column], 'o-', label=f"{label} (~n^{exponent:.2f})")
         plt.xlabel('Ukuran Dataset')
-        plt.ylabel('Waktu Eksekusi (detik)')
-        plt.title('Perbandingan Waktu Eksekusi Linear Search vs Binary Search')
+        plt.ylabel('Waktu Eksekusi (detik, median)')
+        plt.title('Perbandingan Waktu Eksekusi Metode Pencarian (skala log-log)')
         plt.legend()
-        plt.grid(True)
+        plt.grid(True, which='both')
         plt.savefig('search_comparison.png')
         plt.close()
     
     def print_products(self, products, max_results=5):
-        """Menampilkan produk hasil pencarian"""
+        """Menampilkan produk hasil pencarian (daftar posisi produk di katalog)"""
         if not products:
             print("Tidak ada produk yang cocok dengan kata kunci pencarian.")
             return
@@ -152,7 +647,8 @@ class ProductSearchApp:
         table = PrettyTable()
         table.field_names = ["ID", "Nama", "Kategori", "Harga", "Stok"]
         
-        for i, product in enumerate(products[:max_results]):
+        for position in products[:max_results]:
+            product = self.products.row(position)
             table.add_row([
                 product['id'],
                 product['name'],
@@ -164,30 +660,77 @@ class ProductSearchApp:
         print(f"Menampilkan {min(max_results, len(products))} dari {len(products)} hasil:")
         print(table)
         
+    def print_cache_stats(self):
+        cache = self.query_cache
+        print(f"Cache: {cache.hits} hit, {cache.misses} miss, {len(cache.entries)}/{cache.max_size} entri")
+        
     def search_menu(self):
         """Menu pencarian produk"""
         while True:
             print("\n===== APLIKASI PENCARIAN PRODUK ONLINE =====")
             print("1. Cari Produk (Linear Search)")
-            print("2. Cari Produk (Binary Search)")
-            print("3. Jalankan Perbandingan Algoritma")
-            print("4. Keluar")
+            print("2. Cari Produk Berdasarkan Awalan Nama (Binary Search)")
+            print("3. Cari Produk (Indeks Trigram)")
+            print("4. Filter Produk (Kategori, Harga, Stok)")
+            print("5. Cari Produk Termurah (Top-k)")
+            print("6. Cari Produk (Toleran Salah Ketik)")
+            print("7. Jalankan Perbandingan Algoritma")
+            print("8. Keluar")
             
-            choice = input("Pilih menu (1-4): ")
+            choice = input("Pilih menu (1-8): ")
             
             if choice == '1':
                 keyword = input("Masukkan kata kunci pencarian: ")
-                results, execution_time = self.linear_search(keyword)
+                results, execution_time = self.cached_search(keyword, 'linear')
                 print(f"\nHasil pencarian dengan Linear Search (waktu: {execution_time:.6f} detik):")
                 self.print_products(results)
+                self.print_cache_stats()
                 
             elif choice == '2':
-                keyword = input("Masukkan kata kunci pencarian: ")
-                results, execution_time = self.binary_search(keyword)
+                keyword = input("Masukkan awalan nama produk: ")
+                results, execution_time = self.cached_search(keyword, 'binary')
                 print(f"\nHasil pencarian dengan Binary Search (waktu: {execution_time:.6f} detik):")
                 self.print_products(results)
+                self.print_cache_stats()
                 
             elif choice == '3':
+                keyword = input("Masukkan kata kunci pencarian: ")
+                results, execution_time = self.cached_search(keyword, 'trigram')
+                print(f"\nHasil pencarian dengan Indeks Trigram (waktu: {execution_time:.6f} detik):")
+                self.print_products(results)
+                self.print_cache_stats()
+                
+            elif choice == '4':
+                # Input kosong berarti kondisi tersebut tidak dipakai
+                category = input(f"Kategori ({', '.join(self.products.categories)}): ").strip() or None
+                min_price = input("Harga minimum: ").strip()
+                max_price = input("Harga maksimum: ").strip()
+                in_stock = input("Hanya yang ada stok? (y/n): ").strip().lower() == 'y'
+                results, execution_time = self.filter_query(
+                    category,
+                    int(min_price) if min_price else None,
+                    int(max_price) if max_price else None,
+                    min_stock=1 if in_stock else None
+                )
+                print(f"\nHasil filter, termurah lebih dulu (indeks: {self.last_plan}, waktu: {execution_time:.6f} detik):")
+                self.print_products(results, max_results=20)
+                
+            elif choice == '5':
+                keyword = input("Masukkan kata kunci pencarian: ")
+                k = input("Jumlah produk termurah (default 5): ").strip()
+                k = int(k) if k else 5
+                results, execution_time = self.top_k_search(keyword, k)
+                print(f"\n{k} produk termurah yang cocok (waktu: {execution_time:.6f} detik):")
+                self.print_products(results, max_results=k)
+                
+            elif choice == '6':
+                keyword = input("Masukkan kata kunci pencarian: ")
+                max_distance = input("Maksimum salah ketik (default 1): ").strip()
+                results, execution_time = self.fuzzy_search(keyword, int(max_distance) if max_distance else 1)
+                print(f"\nHasil pencarian toleran salah ketik (waktu: {execution_time:.6f} detik):")
+                self.print_products(results)
+                
+            elif choice == '7':
                 keyword = input("Masukkan kata kunci untuk pengujian: ")
                 sizes = [100, 500, 1000, 5000, 10000, 50000, 100000]
                 print("\nMenjalankan pengujian perbandingan waktu eksekusi...")
@@ -200,7 +743,7 @@ class ProductSearchApp:
                 self.plot_comparison(results)
                 print("Grafik berhasil dibuat dan disimpan sebagai 'search_comparison.png'")
                 
-            elif choice == '4':
+            elif choice == '8':
                 print("Terima kasih telah menggunakan Aplikasi Pencarian Produk Online.")
                 break
                 
@@ -209,5 +752,6 @@ class ProductSearchApp:
 
 # Menjalankan aplikasi
 if __name__ == "__main__":
-    app = ProductSearchApp()
+    # Katalog dibuat sekali lalu dibuka dengan mmap pada run berikutnya
+    app = ProductSearchApp(catalog_path='katalog_produk.bin')
     app.search_menu()